@@ -1,5 +1,10 @@
 """BetterGit: A modern, intuitive version control system built on Git."""
 
+import logging
+
+# Library loggers stay silent unless `bit --verbose` configures logging
+logging.getLogger(__name__).addHandler(logging.NullHandler())
+
 __version__ = "1.0.0"
 __author__ = "BetterGit Team"
 __email__ = "team@bettergit.dev"
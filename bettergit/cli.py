@@ -4,32 +4,122 @@ import click
 import os
 import sys
 import logging
+import platform
+import re
+import shutil
+import subprocess
+import time
+from functools import lru_cache, wraps
+from itertools import islice
+from operator import itemgetter
 from pathlib import Path
 from typing import Optional, List, Dict, Any
 
 from .config import config_manager, ConfigError
-from .history import history_manager, HistoryError
 from .core.git import (
-    run_git_command, GitError, is_git_repository, 
-    check_git_available, get_current_branch, has_uncommitted_changes
+    run_git_command, GitError,
+    check_git_available, get_repo_info, RepoInfo, RepoLock,
+    run_git_command_bytes, run_git_command_streaming, git_session
 )
 from .ui import (
     print_success, print_error, print_warning, print_info,
     confirm, prompt_text, prompt_password, select_from_list, 
-    select_multiple, display_table, display_list, display_panel,
-    display_git_graph, display_status_summary, require_confirmation,
-    select_undo_point, SYMBOLS
+    select_multiple, display_table, display_list,
+    display_status_summary, require_confirmation,
+    select_undo_point, truncate_cells, SYMBOLS
 )
-from .integrations import GitHubClient, IntegrationError
 
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
+# Abbreviated or full commit hash (SHA-1 or SHA-256), as accepted by `bit switch`
+_COMMIT_HASH_RE = re.compile(r'[0-9a-fA-F]{4,64}')
+
+# Long-lived branches that cleanup never deletes and undo asks twice about
+_PROTECTED_BRANCHES = frozenset({'main', 'master', 'develop'})
+
+
+def _configure_logging():
+    """Install the console log handler (only needed for --verbose)."""
+    logging.basicConfig(
+        level=logging.DEBUG,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+
+# Lines collected before a single write to stdout in long listings
+_OUTPUT_BATCH_LINES = 256
+
+# Rule printed above and below the saves and history listings
+_LISTING_RULE = "=" * 80
+
+# Operating system name ("Windows", "Darwin", "Linux", ...); fixed per process
+_SYSTEM = platform.system()
+
+
+def _write_lines(lines: List[str]):
+    """Write lines to stdout with one call instead of one print() per line."""
+    if lines:
+        sys.stdout.write('\n'.join(lines) + '\n')
+
+
+def _protected_branches() -> frozenset:
+    """Return the protected branch names, including the configured main branch."""
+    main_branch = config_manager.get_default('main_branch_name')
+    if main_branch and main_branch not in _PROTECTED_BRANCHES:
+        return _PROTECTED_BRANCHES | {main_branch}
+    return _PROTECTED_BRANCHES
+
+
+@lru_cache(maxsize=1)
+def _repo_info() -> RepoInfo:
+    """Return repository info for this invocation, probing git only once.
+    
+    Call _repo_info.cache_clear() after changing directory or branch.
+    """
+    return get_repo_info()
+
+
+def _requires_repo(func):
+    """Report and stop when a command runs outside a Git repository."""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if not _repo_info().in_repo:
+            print_error("Not in a Git repository.")
+            return None
+        return func(*args, **kwargs)
+    return wrapper
+
+
+def _mutates_repo(func):
+    """Hold the repository lock while a state-changing command runs.
+    
+    Read-only commands skip this, so they never wait. Outside a repository
+    the command runs unlocked and reports the problem itself.
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        git_dir = _repo_info().git_dir
+        if not git_dir:
+            return func(*args, **kwargs)
+        try:
+            lock = RepoLock(git_dir).__enter__()
+        except GitError as e:
+            print_error(e.stderr)
+            return None
+        try:
+            return func(*args, **kwargs)
+        finally:
+            lock.__exit__(None, None, None)
+    return wrapper
+
+
+@lru_cache(maxsize=None)
+def _history():
+    """Return the action history manager, importing it on first use."""
+    from .history import history_manager
+    return history_manager
+
 
 @click.group()
 @click.version_option(version="1.0.0", prog_name="BetterGit")
@@ -37,7 +127,7 @@ logger = logging.getLogger(__name__)
 def main(verbose: bool):
     """BetterGit: A modern, intuitive version control system built on Git."""
     if verbose:
-        logging.getLogger().setLevel(logging.DEBUG)
+        _configure_logging()
     
     # Check if git is available
     if not check_git_available():
@@ -52,31 +142,40 @@ def init(project_name: Optional[str], no_remote: bool):
     """Initialize a new Git repository and optionally create a remote."""
     try:
         if project_name:
-            # Create directory if it doesn't exist
-            project_path = Path(project_name)
-            if project_path.exists() and any(project_path.iterdir()):
-                if not confirm(f"Directory '{project_name}' exists and is not empty. Continue?"):
-                    return
+            # Create directory if it doesn't exist; one scandir entry is
+            # enough to tell that an existing directory is not empty
+            if os.path.isdir(project_name):
+                with os.scandir(project_name) as entries:
+                    has_entries = next(entries, None) is not None
             else:
-                project_path.mkdir(exist_ok=True)
+                has_entries = False
+                os.mkdir(project_name)
+            if has_entries and not confirm(f"Directory '{project_name}' exists and is not empty. Continue?"):
+                return
             
-            os.chdir(project_path)
+            os.chdir(project_name)
+            _repo_info.cache_clear()
             print_info(f"Created and entered directory: {project_name}")
         
         # Initialize git repository
-        if is_git_repository():
+        if _repo_info().in_repo:
             print_warning("Already in a Git repository.")
             return
         
-        run_git_command(['init'])
+        # Start on the configured main branch so no rename is needed later
+        main_branch = config_manager.get_default('main_branch_name') or 'main'
+        run_git_command(['-c', f'init.defaultBranch={main_branch}', 'init'], capture_stdout=False)
+        _repo_info.cache_clear()
         print_success("Initialized Git repository")
         
+        cwd = os.getcwd()
+        
         # Create initial commit structure
-        readme_path = Path("README.md")
-        if not readme_path.exists():
-            project_title = project_name or Path.cwd().name
-            readme_content = f"# {project_title}\n\nA new project created with BetterGit.\n"
-            readme_path.write_text(readme_content, encoding='utf-8')
+        created_readme = not os.path.exists("README.md")
+        if created_readme:
+            project_title = project_name or os.path.basename(cwd)
+            with open("README.md", "w", encoding='utf-8') as f:
+                f.write(f"# {project_title}\n\nA new project created with BetterGit.\n")
             print_info("Created README.md")
         
         # Set up remote if requested
@@ -87,9 +186,9 @@ def init(project_name: Optional[str], no_remote: bool):
         
         # Log the action with detailed information
         init_details = {
-            "project_name": project_name or str(Path.cwd().name),
-            "project_path": str(Path.cwd()),
-            "created_readme": not readme_path.exists() or readme_path.stat().st_size == 0,
+            "project_name": project_name or os.path.basename(cwd),
+            "project_path": cwd,
+            "created_readme": created_readme,
             "remote_created": remote_info is not None,
         }
         
@@ -101,7 +200,7 @@ def init(project_name: Optional[str], no_remote: bool):
                 "remote_created_by_user": True  # User explicitly chose to create it
             })
         
-        history_manager.log_action(
+        _history().log_action(
             "init",
             init_details,
             undo_details={"destructive": True}
@@ -118,6 +217,8 @@ def _create_remote_repository():
     Returns:
         Dict with repository info if successful, None if failed/cancelled
     """
+    from .integrations import GitHubClient, IntegrationError
+    
     try:
         # Get current account configuration
         current_account = config_manager.get_current_account()
@@ -145,8 +246,7 @@ def _create_remote_repository():
         repo_name = Path.cwd().name
         description = prompt_text("Repository description (optional): ")
         
-        defaults = config_manager.config.get('defaults', {})
-        default_visibility = defaults.get('repo_visibility', 'private')
+        default_visibility = config_manager.get_default('repo_visibility') or 'private'
         is_private = default_visibility == 'private'
 
         # Create the repository
@@ -164,45 +264,36 @@ def _create_remote_repository():
             print_info("Using HTTPS for repository connection")
         
         # Add remote and push
-        run_git_command(['remote', 'add', 'origin', clone_url])
-        
-        # Create initial commit if repository is empty
-        try:
-            # Check if there are any commits at all
-            run_git_command(['rev-parse', 'HEAD'])
-            has_commits = True
-        except GitError:
-            # No commits exist yet
-            has_commits = False
+        run_git_command(['remote', 'add', 'origin', clone_url], capture_stdout=False)
         
-        if not has_commits:
-            # Repository is empty, create initial commit
-            # First check if there are any files to commit
+        # Create initial commit if repository is empty; one status call tells
+        # us whether HEAD has a commit, what is on disk and the branch name
+        snapshot = _collect_repo_snapshot()
+        if not snapshot['has_commits']:
             try:
-                status_output, _, _ = run_git_command(['status', '--porcelain'])
-                if status_output.strip():
-                    # There are files to commit
-                    run_git_command(['add', '.'])
-                    run_git_command(['commit', '-m', 'Initial commit'])
-                    print_info("Created initial commit")
-                else:
-                    # No files to commit, create a basic README
-                    readme_path = Path("README.md")
-                    if not readme_path.exists():
-                        project_title = Path.cwd().name
-                        readme_content = f"# {project_title}\n\nA new project created with BetterGit.\n"
-                        readme_path.write_text(readme_content, encoding='utf-8')
-                    
-                    run_git_command(['add', '.'])
-                    run_git_command(['commit', '-m', 'Initial commit'])
-                    print_info("Created initial commit with README.md")
+                # With nothing for git to commit, start from a basic README
+                created_readme = not (snapshot['staged'] or snapshot['modified'] or snapshot['untracked'])
+                if created_readme:
+                    try:
+                        with open("README.md", 'x', encoding='utf-8') as f:
+                            f.write(f"# {repo_name}\n\nA new project created with BetterGit.\n")
+                    except FileExistsError:
+                        pass
+                
+                run_git_command(['add', '.'])
+                run_git_command(['commit', '-m', 'Initial commit'], capture_stdout=False)
+                print_info("Created initial commit with README.md" if created_readme else "Created initial commit")
             except GitError as e:
                 print_error(f"Failed to create initial commit: {e}")
                 return
-        
-        # Push to remote
-        main_branch = defaults.get('main_branch_name', 'main')
-        run_git_command(['branch', '-M', main_branch])
+            finally:
+                _invalidate_repo_snapshot()
+        
+        # Push to remote; init already names the branch, so renaming is only
+        # needed for older git versions that ignore init.defaultBranch
+        main_branch = config_manager.get_default('main_branch_name') or 'main'
+        if snapshot['branch'] != main_branch:
+            run_git_command(['branch', '-M', main_branch], capture_stdout=False)
         run_git_command(['push', '-u', 'origin', main_branch])
         
         print_success(f"Created remote repository: {repo_data['html_url']}")
@@ -226,38 +317,26 @@ def _create_remote_repository():
         return None
 
 
+# Private key file names that mark an SSH setup usable for GitHub
+_SSH_KEY_FILES = frozenset({
+    'id_rsa', 'id_ed25519', 'id_ecdsa', 'id_dsa',
+    'github_rsa', 'github_ed25519'
+})
+
+
 def _check_ssh_key_availability() -> bool:
     """Check if SSH keys are available and can be used for GitHub."""
     try:
-        import os
-        import subprocess
-        from pathlib import Path
-        
-        # Check for common SSH key locations
-        ssh_dir = Path.home() / '.ssh'
-        if not ssh_dir.exists():
-            return False
-        
-        # Look for common SSH key files
-        key_files = [
-            'id_rsa', 'id_ed25519', 'id_ecdsa', 'id_dsa',
-            'github_rsa', 'github_ed25519'
-        ]
-        
-        found_keys = []
-        for key_file in key_files:
-            key_path = ssh_dir / key_file
-            if key_path.exists():
-                found_keys.append(key_path)
-        
-        if not found_keys:
-            return False
-        
-        # Simple check - if keys exist, assume they work
-        # The SSH test was causing hangs, so we'll be optimistic
-        # Git operations will fail gracefully if SSH doesn't work
-        return True
-        
+        # One directory listing instead of a stat per candidate key, which
+        # matters on network-mounted home directories
+        with os.scandir(Path.home() / '.ssh') as entries:
+            # Simple check - if keys exist, assume they work
+            # The SSH test was causing hangs, so we'll be optimistic
+            # Git operations will fail gracefully if SSH doesn't work
+            return any(entry.name in _SSH_KEY_FILES for entry in entries)
+        
+    except FileNotFoundError:
+        return False
     except Exception as e:
         # If anything fails, fall back to HTTPS
         logger.debug(f"SSH key check failed: {e}")
@@ -266,6 +345,7 @@ def _check_ssh_key_availability() -> bool:
 
 @main.command('save')
 @click.argument('args', nargs=-1)
+@_mutates_repo
 def commit_save(args):
     """Create a save (commit) with your changes.
     
@@ -280,13 +360,14 @@ def commit_save(args):
       bit save
     """
     try:
-        if not is_git_repository():
+        if not _repo_info().in_repo:
             print_error("Not in a Git repository. Use 'bit init' first.")
             return
         
         # Check if there are any changes
-        status_output, _, _ = run_git_command(['status', '--porcelain'])
-        if not status_output:
+        snapshot = _collect_repo_snapshot()
+        if not (snapshot['staged'] or snapshot['modified'] or
+                snapshot['untracked'] or snapshot['merge_conflicts']):
             print_info("No changes to save.")
             return
         
@@ -295,7 +376,7 @@ def commit_save(args):
         
         if not args:
             # Interactive mode - no arguments provided
-            files = _select_files_to_stage()
+            files = _select_files_to_stage(snapshot['unstaged'])
             if not files:
                 print_info("No files selected.")
                 return
@@ -314,26 +395,32 @@ def commit_save(args):
             print_error("Commit message is required.")
             return
         
-        # Stage the specified files
-        for file_pattern in files:
-            try:
-                run_git_command(['add', file_pattern])
-                print_info(f"Staged: {file_pattern}")
-            except GitError as e:
-                print_warning(f"Could not stage {file_pattern}: {e}")
-        
-        # Check if anything was actually staged
-        staged_output, _, _ = run_git_command(['diff', '--cached', '--name-only'])
-        if not staged_output:
-            print_warning("No files were staged. Nothing to commit.")
-            return
-        
-        # Create the commit
-        run_git_command(['commit', '-m', message])
+        # Saving everything when only tracked files changed: `commit -a`
+        # stages and commits them without rewriting the index first
+        commit_all = (files == ['.'] and _cwd_is_top_level() and
+                      not (snapshot['untracked'] or snapshot['merge_conflicts']) and
+                      not _has_untracked_files())
+        if commit_all:
+            commit_cmd = ['commit', '-a', '-m', message]
+        else:
+            _stage_files(files)
+            commit_cmd = ['commit', '-m', message]
+        _invalidate_repo_snapshot()
+        
+        # Create the commit straight away: git itself refuses when nothing is
+        # staged, so the index is only inspected after a failure, to tell
+        # that case apart from others (hooks, identity, ...)
+        _, stderr, returncode = run_git_command(commit_cmd, check=False, capture_stdout=False)
+        if returncode != 0:
+            _, _, staged = run_git_command(['diff', '--cached', '--quiet'], check=False)
+            if staged == 0 and not (commit_all or snapshot['merge_conflicts']):
+                print_warning("No files were staged. Nothing to commit.")
+                return
+            raise GitError(commit_cmd, returncode, stderr)
         print_success(f"Saved changes: {message}")
         
         # Log the action to history
-        history_manager.log_action(
+        _history().log_action(
             "save",
             {"message": message, "files": files},
             undo_command="git reset --soft HEAD~1",
@@ -342,92 +429,284 @@ def commit_save(args):
         
     except GitError as e:
         print_error(f"Failed to save changes: {e}")
-    except (HistoryError, ConfigError) as e:
+    except ConfigError as e:
         print_warning(f"Could not log to history: {e}")
 
 
-def _show_git_status():
-    """Show a formatted git status."""
+def _has_untracked_files() -> bool:
+    """Check for files `git add .` would pick up but `commit -a` would not.
+    
+    Asked directly rather than read from the status snapshot, which is empty
+    for untracked files when status.showUntrackedFiles is 'no'.
+    """
+    output, _, _ = run_git_command_bytes([
+        'ls-files', '-z', '--others', '--exclude-standard', '--directory', '--no-empty-directory'
+    ])
+    return bool(output)
+
+
+def _cwd_is_top_level() -> bool:
+    """Check whether the working directory is the root of the work tree.
+    
+    Pathspecs like '.' only cover the whole tree from there.
+    """
+    top_level = _repo_info().top_level
     try:
-        # Get detailed status
-        status_output, _, _ = run_git_command(['status', '--porcelain'])
-        
-        staged = []
-        modified = []
-        untracked = []
-        
-        for line in status_output.split('\n'):
-            if not line:
+        return bool(top_level) and os.path.samefile(top_level, os.getcwd())
+    except OSError:
+        return False
+
+
+# git add stops at the first pathspec that matches nothing and names it
+# (matched against untranslated messages, see _C_LOCALE)
+_UNMATCHED_PATHSPEC_RE = re.compile(r"pathspec '(.*)' did not match any files")
+
+# Environment for git calls whose messages are parsed: English, whatever the user's locale
+_C_LOCALE = {'LC_ALL': 'C'}
+
+# Characters of paths passed to one `git add`; stays under the smallest
+# command-line limit git runs with (32767 characters on Windows)
+_ADD_ARGV_BUDGET = 30000
+
+
+def _stage_files(files: List[str]):
+    """Stage files with as few `git add` calls as possible.
+    
+    Everything goes in one call, unless the paths would overflow the
+    command line, in which case they are split into as few calls as fit.
+    """
+    chunk, size = [], 0
+    for file_pattern in files:
+        if chunk and size + len(file_pattern) + 1 > _ADD_ARGV_BUDGET:
+            _stage_chunk(chunk)
+            chunk, size = [], 0
+        chunk.append(file_pattern)
+        size += len(file_pattern) + 1
+    if chunk:
+        _stage_chunk(chunk)
+
+
+def _stage_chunk(files: List[str]):
+    """Stage files with one `git add` call.
+    
+    A pathspec that matches nothing is reported and dropped before retrying
+    the rest together; any other failure falls back to staging files one at
+    a time.
+    """
+    pending = list(files)
+    while pending:
+        try:
+            run_git_command(['add', '--', *pending], env=_C_LOCALE)
+        except GitError as e:
+            match = _UNMATCHED_PATHSPEC_RE.search(e.stderr)
+            if match and match.group(1) in pending:
+                print_warning(f"Could not stage {match.group(1)}: {e}")
+                pending.remove(match.group(1))
                 continue
             
-            status_code = line[:2]
-            filename = line[3:]
-            
-            if status_code[0] in 'MADRC':
-                staged.append(filename)
-            elif status_code[1] in 'MD':
-                modified.append(filename)
-            elif status_code == '??':
-                untracked.append(filename)
-        
-        # Display status summary
-        status_info = {
-            'branch': get_current_branch(),
-            'staged': staged,
-            'modified': modified,
-            'untracked': untracked
-        }
-        
-        display_status_summary(status_info)
+            for file_pattern in pending:
+                try:
+                    run_git_command(['add', '--', file_pattern])
+                    print_info(f"Staged: {file_pattern}")
+                except GitError as e:
+                    print_warning(f"Could not stage {file_pattern}: {e}")
+            return
         
-    except GitError as e:
-        print_warning(f"Could not get status: {e}")
+        for file_pattern in pending:
+            print_info(f"Staged: {file_pattern}")
+        return
+
+
+# Per-invocation cache of parsed `git status` output, keyed by working directory
+_repo_snapshots: Dict[str, Dict[str, Any]] = {}
+
+# Descriptions for unstaged entries, indexed by the code stored in snapshot['unstaged']
+_CHANGED, _MODIFIED, _DELETED, _UNTRACKED = range(4)
+_STAGE_DESCRIPTIONS = ('changed', 'modified', 'deleted', 'untracked')
+
+# Porcelain XY status bytes: index codes that count as staged, worktree
+# codes that count as modified, and worktree code -> unstaged description
+_STAGED_CODES = frozenset(b'MADRC')
+_MODIFIED_CODES = frozenset(b'MD')
+_UNSTAGED_CODES = {ord('M'): _MODIFIED, ord('D'): _DELETED}
+
+
+def _decode_path(raw: bytes) -> str:
+    """Decode a path from git output, keeping undecodable bytes round-trippable."""
+    return raw.decode('utf-8', 'surrogateescape')
+
+
+def _snapshot_header(snapshot: Dict[str, Any], entry: bytes, entries):
+    """Handle a `# branch.*` or `# stash` header line."""
+    key, _, value = entry[2:].decode('utf-8', 'replace').partition(' ')
+    if key == 'branch.oid':
+        snapshot['has_commits'] = value != '(initial)'
+    elif key == 'branch.head':
+        snapshot['branch'] = None if value == '(detached)' else value
+    elif key == 'branch.upstream':
+        snapshot['remote_branch'] = value
+    elif key == 'branch.ab':
+        ahead, _, behind = value.partition(' ')
+        snapshot['ahead'] = int(ahead.lstrip('+'))
+        snapshot['behind'] = int(behind.lstrip('-'))
+    elif key == 'stash':
+        snapshot['stash_count'] = int(value)
+
+
+def _snapshot_changed(snapshot: Dict[str, Any], entry: bytes, entries):
+    """Handle an ordinary (`1`) or renamed/copied (`2`) entry."""
+    if entry[0] == 0x32:  # b'2': 9 fields before the path, original path follows
+        filename = _decode_path(entry.split(b' ', 9)[9])
+        next(entries, None)
+    else:
+        filename = _decode_path(entry.split(b' ', 8)[8])
+    
+    index_code, worktree_code = entry[2], entry[3]
+    if index_code in _STAGED_CODES:
+        snapshot['staged'].append(filename)
+    elif worktree_code in _MODIFIED_CODES:
+        snapshot['modified'].append(filename)
+    
+    if index_code == 0x2E:  # b'.': nothing staged for this file yet
+        snapshot['unstaged'].append((filename, _UNSTAGED_CODES.get(worktree_code, _CHANGED)))
+
+
+def _snapshot_untracked(snapshot: Dict[str, Any], entry: bytes, entries):
+    """Handle an untracked (`?`) entry."""
+    filename = _decode_path(entry[2:])
+    snapshot['untracked'].append(filename)
+    snapshot['unstaged'].append((filename, _UNTRACKED))
+
+
+def _snapshot_unmerged(snapshot: Dict[str, Any], entry: bytes, entries):
+    """Handle an unmerged (`u`) entry."""
+    snapshot['merge_conflicts'].append(_decode_path(entry.split(b' ', 10)[10]))
+
+
+_SNAPSHOT_HANDLERS = {
+    ord('#'): _snapshot_header,
+    ord('1'): _snapshot_changed,
+    ord('2'): _snapshot_changed,
+    ord('?'): _snapshot_untracked,
+    ord('u'): _snapshot_unmerged,
+}
 
 
-def _select_files_to_stage():
-    """Interactive file selection for staging."""
+def _collect_repo_snapshot() -> Dict[str, Any]:
+    """Collect branch and file status from a single `git status` call.
+    
+    Runs `git status --porcelain=v2 --branch --show-stash -z` once and parses
+    the raw bytes in one pass, decoding only the filename fields. The result is
+    cached for the rest of the command, so callers share one git process.
+    
+    Returns:
+        Dict usable by display_status_summary, plus an 'unstaged' list of
+        (filename, description code) tuples for interactive staging.
+    """
+    cwd = os.getcwd()
+    snapshot = _repo_snapshots.get(cwd)
+    if snapshot is not None:
+        return snapshot
+    
+    output, _, _ = run_git_command_bytes(['status', '--porcelain=v2', '--branch', '--show-stash', '-z'])
+    
+    snapshot = {
+        'branch': None,
+        'has_commits': True,
+        'remote_branch': None,
+        'ahead': 0,
+        'behind': 0,
+        'stash_count': 0,
+        'staged': [],
+        'modified': [],
+        'untracked': [],
+        'merge_conflicts': [],
+        'unstaged': [],
+    }
+    
+    entries = iter(output.split(b'\x00'))
+    for entry in entries:
+        if entry:
+            handler = _SNAPSHOT_HANDLERS.get(entry[0])
+            if handler:
+                handler(snapshot, entry, entries)
+    
+    _repo_snapshots[cwd] = snapshot
+    return snapshot
+
+
+def _invalidate_repo_snapshot():
+    """Drop cached status after a command changes the index or working tree."""
+    _repo_snapshots.clear()
+
+
+def _show_git_status():
+    """Show a formatted git status."""
     try:
-        status_output, _, _ = run_git_command(['status', '--porcelain'])
-        
-        files = []
-        file_choices = []
-        
-        for line in status_output.split('\n'):
-            if not line:
-                continue
-            
-            status_code = line[:2]
-            filename = line[3:]
-            
-            # Skip already staged files
-            if status_code[0] not in ' ?':
-                continue
-            
-            status_desc = {
-                ' M': 'modified',
-                ' D': 'deleted',
-                '??': 'untracked',
-                'MM': 'modified (partially staged)'
-            }.get(status_code, 'changed')
-            
-            files.append(filename)
-            file_choices.append((filename, f"{filename} ({status_desc})"))
-        
-        if not files:
-            print_info("No unstaged files to select.")
-            return []
-        
-        selected = select_multiple("Select files to stage:", file_choices)
-        return selected
+        display_status_summary(_collect_repo_snapshot())
         
     except GitError as e:
-        print_error(f"Failed to get file list: {e}")
+        print_warning(f"Could not get status: {e}")
+
+
+# Interactive staging lists at most this many files; checkbox prompts become
+# unusable (and slow to draw) well before a large monorepo's change count
+_MAX_STAGE_CHOICES = 200
+
+
+def _select_files_to_stage(unstaged: List[tuple]):
+    """Interactive file selection for staging.
+    
+    Args:
+        unstaged: (filename, description code) tuples from _collect_repo_snapshot()
+    """
+    if not unstaged:
+        print_info("No unstaged files to select.")
         return []
+    
+    if len(unstaged) == 1:
+        # Nothing to choose between
+        filename = unstaged[0][0]
+        print_info(f"Staging the only changed file: {filename}")
+        return [filename]
+    
+    # (label, value) choices, so the selection returns the file names
+    file_choices = [
+        (f"{filename} ({_STAGE_DESCRIPTIONS[code]})", filename)
+        for filename, code in islice(unstaged, _MAX_STAGE_CHOICES)
+    ]
+    hidden = len(unstaged) - len(file_choices)
+    if hidden > 0:
+        print_info(f"Showing the first {len(file_choices)} files; {hidden} more can be "
+                   "saved by naming them: bit save <files> \"message\"")
+    
+    selected = select_multiple("Select files to stage:", file_choices)
+    return selected
+
+
+# What `bit list` can show: list type -> handler taking (limit, detailed)
+_LIST_HANDLERS = {
+    'branches': lambda limit, detailed: _list_branches(),
+    'saves': lambda limit, detailed: _list_saves(limit),
+    'remotes': lambda limit, detailed: _list_remotes(),
+    'accounts': lambda limit, detailed: _list_accounts(),
+    'stashes': lambda limit, detailed: _list_stashes(),
+    'history': lambda limit, detailed: _list_history(limit, detailed),
+}
+
+# Interactive `bit list` menu as (label, key) choices, so the prompt returns the key
+_LIST_MENU_CHOICES = [
+    ("📁 Branches - Show all local and remote branches", "branches"),
+    ("💾 Saves - Show recent commits/saves", "saves"),
+    ("🌐 Remotes - Show configured remote repositories", "remotes"),
+    ("👤 Accounts - Show configured user accounts", "accounts"),
+    ("📦 Stashes - Show stashed changes", "stashes"),
+    ("📋 History - Show action history", "history"),
+]
 
 
 @main.command('list')
-@click.argument('list_type', required=False, 
-                type=click.Choice(['branches', 'saves', 'remotes', 'accounts', 'stashes', 'history']))
+@click.argument('list_type', required=False, metavar='[' + '|'.join(_LIST_HANDLERS) + ']')
 @click.option('--limit', '-n', default=10, help='Number of recent actions to show (for history only)')
 @click.option('--detailed', '-d', is_flag=True, help='Show detailed timestamps (for history only)')
 def list_command(list_type: Optional[str], limit: int, detailed: bool):
@@ -438,18 +717,13 @@ def list_command(list_type: Optional[str], limit: int, detailed: bool):
             _interactive_list_menu(limit, detailed)
             return
         
-        if list_type == 'branches':
-            _list_branches()
-        elif list_type == 'saves':
-            _list_saves(limit)
-        elif list_type == 'remotes':
-            _list_remotes()
-        elif list_type == 'accounts':
-            _list_accounts()
-        elif list_type == 'stashes':
-            _list_stashes()
-        elif list_type == 'history':
-            _list_history(limit, detailed)
+        handler = _LIST_HANDLERS.get(list_type)
+        if handler is None:
+            print_error(f"Unknown list type '{list_type}'. "
+                       f"Choose from: {', '.join(_LIST_HANDLERS)}")
+            sys.exit(2)
+        
+        handler(limit, detailed)
             
     except (GitError, ConfigError) as e:
         print_error(f"Failed to list {list_type}: {e}")
@@ -457,71 +731,40 @@ def list_command(list_type: Optional[str], limit: int, detailed: bool):
 
 def _interactive_list_menu(limit: int, detailed: bool):
     """Show interactive menu to choose what to list."""
-    menu_options = [
-        ("branches", "📁 Branches - Show all local and remote branches"),
-        ("saves", "💾 Saves - Show recent commits/saves"),
-        ("remotes", "🌐 Remotes - Show configured remote repositories"),
-        ("accounts", "👤 Accounts - Show configured user accounts"),
-        ("stashes", "📦 Stashes - Show stashed changes"),
-        ("history", "📋 History - Show action history")
-    ]
-    
-    choice_texts = [option[1] for option in menu_options]
-    
     print_info("What would you like to list?")
-    selected = select_from_list("Choose an option:", choice_texts)
+    selected_key = select_from_list("Choose an option:", _LIST_MENU_CHOICES)
     
-    if selected is None:
+    if selected_key is None:
         print_info("List cancelled.")
         return
     
-    # Find the selected option
-    selected_key = None
-    for key, text in menu_options:
-        if text == selected:
-            selected_key = key
-            break
-    
-    if not selected_key:
-        print_error("Invalid selection.")
-        return
-    
     # Execute the selected list function
-    if selected_key == 'branches':
-        _list_branches()
-    elif selected_key == 'saves':
-        _list_saves(limit)
-    elif selected_key == 'remotes':
-        _list_remotes()
-    elif selected_key == 'accounts':
-        _list_accounts()
-    elif selected_key == 'stashes':
-        _list_stashes()
-    elif selected_key == 'history':
-        _list_history(limit, detailed)
+    _LIST_HANDLERS[selected_key](limit, detailed)
+
+
+# One `bit list branches` line per ref: the current branch is marked and
+# symbolic refs (origin/HEAD) show their target
+_BRANCH_LIST_FORMAT = (
+    '--format=%(if)%(HEAD)%(then)' + SYMBOLS['success'].replace('%', '%%') +
+    ' %(refname:lstrip=2) (current)%(else)  %(refname:lstrip=2)'
+    '%(if)%(symref)%(then) -> %(symref:lstrip=2)%(end)%(end)'
+)
 
 
 def _list_branches():
     """List all branches."""
-    if not is_git_repository():
+    if not _repo_info().in_repo:
         return
     
     try:
-        output, _, _ = run_git_command(['branch', '-a'])
-        branches = []
-        current_branch = None
-        
-        for line in output.split('\n'):
-            line = line.strip()
-            if not line:
-                continue
-            
-            if line.startswith('* '):
-                current_branch = line[2:]
-                branches.append(f"{SYMBOLS['success']} {current_branch} (current)")
-            else:
-                branch_name = line.replace('remotes/', '')
-                branches.append(f"  {branch_name}")
+        # git renders each display line itself; raw output keeps the
+        # leading spaces of non-current branches
+        output, _, _ = run_git_command_bytes([
+            'for-each-ref', _BRANCH_LIST_FORMAT, 'refs/heads', 'refs/remotes'
+        ])
+        branches = _decode_path(output).split('\n')
+        if not branches[-1]:
+            branches.pop()
         
         if branches:
             display_list(f"{SYMBOLS['clipboard']} Branches", branches, numbered=False)
@@ -534,64 +777,59 @@ def _list_branches():
 
 def _list_saves(limit: int = 10):
     """List recent saves (commits)."""
-    if not is_git_repository():
+    if not _repo_info().in_repo:
         return
     
     try:
-        # Get commits with ISO timestamp for better time calculation
-        output, _, _ = run_git_command([
-            'log', f'-{limit}', '--pretty=format:%h|%an|%ai|%s'
-        ])
+        # Unit separators cannot appear in names or subjects, and the commit
+        # time as epoch seconds needs no timezone handling. Lines are printed
+        # in batches as git produces them, so large limits start showing at once
+        now = time.time()
+        lines = []
+        count = 0
+        for line in run_git_command_streaming([
+            'log', f'-{limit}', '--pretty=format:%h%x1f%an%x1f%ct%x1f%s'
+        ]):
+            # Partition chain: no intermediate list per commit
+            commit_hash, _, rest = line.partition('\x1f')
+            author, _, rest = rest.partition('\x1f')
+            timestamp, sep, message = rest.partition('\x1f')
+            if not sep:
+                continue
+            if not count:
+                lines.append(f"\n{SYMBOLS['save']} Recent Saves:")
+                lines.append(_LISTING_RULE)
+            count += 1
+            
+            time_str = _relative_time(int(timestamp), now)
+            
+            # Display in the same format as interactive undo
+            lines.append(f"  {count:2d}. {commit_hash}: \"{message}\" by {author} ({time_str})")
+            if len(lines) >= _OUTPUT_BATCH_LINES:
+                _write_lines(lines)
+                lines = []
         
-        if not output:
+        if not count:
             print_info("No commits found.")
             return
         
-        # Use the same formatting as interactive undo
-        from datetime import datetime
-        
-        print(f"\n{SYMBOLS['save']} Recent Saves:")
-        print("=" * 80)
-        
-        for i, line in enumerate(output.split('\n')):
-            if line:
-                parts = line.split('|', 3)
-                if len(parts) == 4:
-                    commit_hash, author, timestamp_str, message = parts
-                    
-                    # Calculate relative time (same logic as interactive undo)
-                    try:
-                        # Parse ISO timestamp, handle timezone offset
-                        timestamp_clean = timestamp_str.split(' +')[0].split(' -')[0]  # Remove timezone
-                        action_time = datetime.fromisoformat(timestamp_clean.replace(' ', 'T'))
-                        now = datetime.now()
-                        diff = now - action_time
-                        total_seconds = diff.total_seconds()
-                        
-                        if diff.days > 7:
-                            time_str = timestamp_clean.split('T')[0]
-                        elif diff.days > 0:
-                            time_str = f"{diff.days}d ago"
-                        elif total_seconds > 3600:
-                            hours = int(total_seconds // 3600)
-                            time_str = f"{hours}h ago"
-                        elif total_seconds > 60:
-                            minutes = int(total_seconds // 60)
-                            time_str = f"{minutes}m ago"
-                        else:
-                            time_str = "just now"
-                    except:
-                        time_str = timestamp_str.split(' ')[0]
-                    
-                    # Display in the same format as interactive undo
-                    choice_text = f"{commit_hash}: \"{message}\" by {author} ({time_str})"
-                    print(f"  {i+1:2d}. {choice_text}")
-                    # print(f"      {commit_hash} by {author}")
-        
-        print("=" * 80)
+        lines.append(_LISTING_RULE)
+        _write_lines(lines)
         
     except GitError as e:
-        print_warning(f"Could not list saves: {e}")
+        if _head_is_unborn():
+            print_info("No commits found.")
+        else:
+            print_warning(f"Could not list saves: {e}")
+
+
+def _head_is_unborn() -> bool:
+    """Check whether HEAD has no commit yet (a fresh repository).
+    
+    `git log` fails outright on an unborn branch; callers check this only
+    after such a failure, so the usual path pays nothing for it.
+    """
+    return git_session.object_info('HEAD') is None
 
 
 def _list_recent_saves():
@@ -601,7 +839,7 @@ def _list_recent_saves():
 
 def _list_remotes():
     """List remote repositories."""
-    if not is_git_repository():
+    if not _repo_info().in_repo:
         return
     
     try:
@@ -611,11 +849,7 @@ def _list_remotes():
             print_info("No remotes configured.")
             return
         
-        remotes = []
-        for line in output.split('\n'):
-            if line:
-                remotes.append(line)
-        
+        remotes = [line for line in output.split('\n') if line]
         display_list(f"{SYMBOLS['remote']} Remotes", remotes, numbered=False)
         
     except GitError as e:
@@ -632,13 +866,14 @@ def _list_accounts():
             print_info("No accounts configured.")
             return
         
-        account_list = []
-        for alias, account in accounts.items():
-            marker = SYMBOLS['success'] if alias == current else " "
-            name = account.get('name', 'Unknown')
-            email = account.get('email', 'No email')
-            has_cred = SYMBOLS['key'] if config_manager.get_credential(alias) else SYMBOLS['lock']
-            account_list.append(f"{marker} {alias}: {name} <{email}> {has_cred}")
+        stored = set(config_manager.list_stored_credentials())
+        current_marker, key, lock = SYMBOLS['success'], SYMBOLS['key'], SYMBOLS['lock']
+        account_list = [
+            f"{current_marker if alias == current else ' '} {alias}: "
+            f"{account.get('name', 'Unknown')} <{account.get('email', 'No email')}> "
+            f"{key if alias in stored else lock}"
+            for alias, account in accounts.items()
+        ]
         
         display_list(f"{SYMBOLS['user']} Accounts", account_list, numbered=False)
         
@@ -648,7 +883,7 @@ def _list_accounts():
 
 def _list_stashes():
     """List stashes."""
-    if not is_git_repository():
+    if not _repo_info().in_repo:
         return
     
     try:
@@ -667,88 +902,31 @@ def _list_stashes():
 
 def _list_history(limit: int, detailed: bool):
     """Show history of state-changing actions."""
+    from .history import HistoryError
+    
     try:
-        actions = history_manager.get_history(limit)
+        actions = _history().get_history(limit)
         
         if not actions:
             print_info("No actions in history.")
             return
         
-        # Use the same formatting as interactive undo
-        from datetime import datetime
-        
-        print(f"\n{SYMBOLS['clipboard']} Action History:")
-        print("=" * 80)
-        
-        # Get recent actions (most recent first, like undo)
-        recent_actions = list(reversed(actions))[:limit]
+        lines = [f"\n{SYMBOLS['clipboard']} Action History:", _LISTING_RULE]
         
-        for i, action in enumerate(recent_actions):
-            action_type = action['action_type']
-            
-            # Calculate relative time (same logic as interactive undo)
-            timestamp_str = action['timestamp'][:19].replace('T', ' ')
-            try:
-                action_time = datetime.fromisoformat(timestamp_str)
-                now = datetime.now()
-                diff = now - action_time
-                total_seconds = diff.total_seconds()
-                
-                if diff.days > 7:
-                    time_str = timestamp_str.split(' ')[0]
-                elif diff.days > 0:
-                    time_str = f"{diff.days}d ago"
-                elif total_seconds > 3600:
-                    hours = int(total_seconds // 3600)
-                    time_str = f"{hours}h ago"
-                elif total_seconds > 60:
-                    minutes = int(total_seconds // 60)
-                    time_str = f"{minutes}m ago"
-                else:
-                    time_str = "just now"
-            except:
-                time_str = timestamp_str
-            
-            # Format details (same logic as interactive undo)
-            details_dict = action.get('details', {})
-            if action_type == 'save':
-                message = details_dict.get('message', '')
-                details = f'"{message}"'
-            elif action_type == 'switch':
-                from_branch = details_dict.get('from_branch', '')
-                to_branch = details_dict.get('to_branch', '')
-                to_commit = details_dict.get('to_commit', '')
-                if to_commit:
-                    details = f"{from_branch} → {to_commit[:8]}"
-                else:
-                    details = f"{from_branch} → {to_branch}"
-            elif action_type == 'push':
-                branch = details_dict.get('branch', '')
-                force = details_dict.get('force', False)
-                details = f"to {branch}" + (" (force)" if force else "")
-            elif action_type == 'pull':
-                branch = details_dict.get('branch', '')
-                rebase = details_dict.get('rebase', False)
-                details = f"from {branch}" + (" (rebase)" if rebase else "")
-            elif action_type == 'stash':
-                message = details_dict.get('message', '')
-                details = f'"{message}"' if message else "untitled"
-            elif action_type == 'init':
-                project_name = details_dict.get('project_name', '')
-                details = f"project: {project_name}"
-            else:
-                details = str(details_dict)[:50]
-            
-            # Display in the same format as interactive undo, with optional timestamp
-            choice_text = f"{action_type.upper()}: {details} ({time_str})"
-            print(f"  {i+1:2d}. {choice_text}")
+        # Most recent first, formatted the same way as interactive undo
+        now = time.time()
+        for i, action in enumerate(reversed(actions)):
+            details, time_str = _format_action(action, now)
+            lines.append(f"  {i+1:2d}. {action['action_type'].upper()}: {details} ({time_str})")
             
             # Only show timestamp if detailed flag is set
             if detailed:
+                timestamp_str = action['timestamp'][:19].replace('T', ' ')
                 timestamp_display = timestamp_str.replace(' ', ' at ')  # Format: 2025-07-24 at 12:45:32
-                print(f"      {timestamp_display}")
+                lines.append(f"      {timestamp_display}")
         
-        print("=" * 80)
+        lines.append(_LISTING_RULE)
+        _write_lines(lines)
         
     except HistoryError as e:
         print_error(f"Failed to get history: {e}")
@@ -757,6 +935,8 @@ def _list_history(limit: int, detailed: bool):
 @main.command()
 @click.argument('target')
 @click.option('--create', '-c', is_flag=True, help='Create the branch if it does not exist')
+@_requires_repo
+@_mutates_repo
 def switch(target: str, create: bool):
     """Switch between branches, saves (commits), or accounts.
     
@@ -764,10 +944,6 @@ def switch(target: str, create: bool):
     or use -c/--create to create it automatically.
     """
     try:
-        if not is_git_repository():
-            print_error("Not in a Git repository.")
-            return
-        
         # Determine what type of target this is
         target_type = _identify_switch_target(target)
         
@@ -793,40 +969,52 @@ def switch(target: str, create: bool):
 
 def _identify_switch_target(target: str) -> str:
     """Identify whether target is a branch, commit, or account."""
-    # Check if it's a branch
-    try:
-        branches_output, _, _ = run_git_command(['branch', '-a'])
-        for line in branches_output.split('\n'):
-            branch_name = line.strip().lstrip('* ').replace('remotes/origin/', '')
-            if branch_name == target:
-                return 'branch'
-    except GitError:
-        pass
-    
-    # Check if it's an account
+    # Check if it's an account (in-memory lookup, no git process needed)
     accounts = config_manager.get_accounts()
     if target in accounts:
         return 'account'
     
-    # Check if it looks like a commit hash
-    if len(target) >= 4 and all(c in '0123456789abcdef' for c in target.lower()):
+    # Check if it looks like a commit hash, confirming it through the
+    # long-lived cat-file process
+    if _is_commit_hash(target):
         return 'commit'
     
+    if _branch_exists(target):
+        return 'branch'
+    
     return 'unknown'
 
 
+def _branch_exists(name: str) -> bool:
+    """Check for a local branch or a branch on origin via the cat-file session."""
+    return any(git_session.object_infos([f'refs/heads/{name}', f'refs/remotes/origin/{name}']))
+
+
+def _is_commit_hash(target: str) -> bool:
+    """Check that target is an abbreviation of an existing commit's hash.
+    
+    A hex-named branch also resolves to a commit, but one whose name does
+    not start with the target, so it is rejected here.
+    """
+    if not _COMMIT_HASH_RE.fullmatch(target):
+        return False
+    info = git_session.object_info(f'{target}^{{commit}}')
+    return bool(info) and info[0].startswith(target.lower())
+
+
 def _switch_branch(branch_name: str, create: bool = False):
     """Switch to a branch, optionally creating it if it doesn't exist."""
     try:
-        current_branch = get_current_branch()
+        current_branch = _repo_info().branch
         
         # Try to switch to the branch first
         try:
             run_git_command(['switch', branch_name])
+            _repo_info.cache_clear()
             print_success(f"Switched to branch '{branch_name}'")
             
             # Log the action
-            history_manager.log_action(
+            _history().log_action(
                 "switch",
                 {"from_branch": current_branch, "to_branch": branch_name},
                 undo_command=f"git switch {current_branch}" if current_branch else None
@@ -850,14 +1038,15 @@ def _switch_branch(branch_name: str, create: bool = False):
 def _create_and_switch_branch(branch_name: str):
     """Create a new branch and switch to it."""
     try:
-        current_branch = get_current_branch()
+        current_branch = _repo_info().branch
         
         # Create and switch to the new branch
         run_git_command(['switch', '-c', branch_name])
+        _repo_info.cache_clear()
         print_success(f"Created and switched to new branch '{branch_name}'")
         
         # Log the action
-        history_manager.log_action(
+        _history().log_action(
             "create_branch",
             {"from_branch": current_branch, "new_branch": branch_name},
             undo_command=f"git switch {current_branch} && git branch -d {branch_name}" if current_branch else f"git branch -d {branch_name}"
@@ -870,14 +1059,15 @@ def _create_and_switch_branch(branch_name: str):
 def _switch_commit(commit_hash: str):
     """Switch to a specific commit (detached HEAD)."""
     try:
-        current_branch = get_current_branch()
+        current_branch = _repo_info().branch
         run_git_command(['checkout', commit_hash])
+        _repo_info.cache_clear()
         print_success(f"Switched to commit {commit_hash}")
         print_warning("You are now in 'detached HEAD' state. "
                      "Changes will not be saved to any branch unless you create a new branch.")
         
         # Log the action
-        history_manager.log_action(
+        _history().log_action(
             "switch",
             {"from_branch": current_branch, "to_commit": commit_hash},
             undo_command=f"git switch {current_branch}" if current_branch else None
@@ -895,9 +1085,9 @@ def _switch_account(account_alias: str):
         print_success(f"Switched to account '{account_alias}' ({account['name']})")
         
         # Update git config for this repository
-        if is_git_repository():
-            run_git_command(['config', 'user.name', account['name']])
-            run_git_command(['config', 'user.email', account['email']])
+        if _repo_info().in_repo:
+            run_git_command(['config', 'user.name', account['name']], capture_stdout=False)
+            run_git_command(['config', 'user.email', account['email']], capture_stdout=False)
             print_info("Updated git user configuration for this repository")
         
     except (ConfigError, GitError) as e:
@@ -905,13 +1095,10 @@ def _switch_account(account_alias: str):
 
 
 @main.command()
+@_requires_repo
 def status():
     """Show repository status."""
     try:
-        if not is_git_repository():
-            print_error("Not in a Git repository.")
-            return
-        
         _show_git_status()
         
     except GitError as e:
@@ -920,14 +1107,12 @@ def status():
 
 @main.command()
 @click.option('--force', '-f', is_flag=True, help='Force push (dangerous)')
+@_requires_repo
+@_mutates_repo
 def push(force: bool):
     """Push changes to remote repository."""
     try:
-        if not is_git_repository():
-            print_error("Not in a Git repository.")
-            return
-        
-        current_branch = get_current_branch()
+        current_branch = _repo_info().branch
         if not current_branch:
             print_error("Cannot push from detached HEAD state.")
             return
@@ -939,11 +1124,20 @@ def push(force: bool):
             run_git_command(['push', '--force'])
             print_success("Force pushed to remote (dangerous operation completed)")
         else:
+            # Local check against the upstream ref saves a network round-trip
+            # when there is nothing to send; with no upstream, let git decide
+            ahead, _, returncode = run_git_command(
+                ['rev-list', '--count', '@{upstream}..HEAD'], check=False
+            )
+            if returncode == 0 and ahead == '0':
+                print_info("Already up to date; nothing to push.")
+                return
+            
             run_git_command(['push'])
             print_success("Pushed to remote")
         
         # Log the action
-        history_manager.log_action(
+        _history().log_action(
             "push",
             {"branch": current_branch, "force": force},
             undo_command="git push --force" if force else None,
@@ -956,14 +1150,12 @@ def push(force: bool):
 
 @main.command()
 @click.option('--rebase', is_flag=True, help='Use rebase instead of merge')
+@_requires_repo
+@_mutates_repo
 def pull(rebase: bool):
     """Pull changes from remote repository."""
     try:
-        if not is_git_repository():
-            print_error("Not in a Git repository.")
-            return
-        
-        current_branch = get_current_branch()
+        current_branch = _repo_info().branch
         if not current_branch:
             print_error("Cannot pull in detached HEAD state.")
             return
@@ -977,7 +1169,7 @@ def pull(rebase: bool):
         print_success("Pulled changes from remote")
         
         # Log the action
-        history_manager.log_action(
+        _history().log_action(
             "pull",
             {"branch": current_branch, "rebase": rebase},
             undo_command="git reset --hard HEAD@{1}"
@@ -989,14 +1181,14 @@ def pull(rebase: bool):
 
 @main.command()
 @click.argument('message', required=False)
+@_requires_repo
+@_mutates_repo
 def stash(message: Optional[str]):
     """Manually stash uncommitted changes."""
     try:
-        if not is_git_repository():
-            print_error("Not in a Git repository.")
-            return
-        
-        if not has_uncommitted_changes():
+        # Untracked files are not stashed by `git stash push`, so ignore them here
+        snapshot = _collect_repo_snapshot()
+        if not (snapshot['staged'] or snapshot['modified'] or snapshot['merge_conflicts']):
             print_info("No changes to stash.")
             return
         
@@ -1008,7 +1200,9 @@ def stash(message: Optional[str]):
         print_success("Stashed uncommitted changes")
         
         # Log the action
-        history_manager.log_action(
+        _invalidate_repo_snapshot()
+        
+        _history().log_action(
             "stash",
             {"message": message},
             undo_command="git stash pop"
@@ -1021,6 +1215,7 @@ def stash(message: Optional[str]):
 @main.command()
 @click.option('--interactive', '-i', is_flag=True, help='Interactive mode to select which action to undo')
 @click.argument('target', required=False)
+@_mutates_repo
 def undo(interactive: bool, target: Optional[str]):
     """Undo the last state-changing action, or undo a specific commit/branch.
     
@@ -1030,6 +1225,8 @@ def undo(interactive: bool, target: Optional[str]):
       bit undo <commit_hash>      # Delete/undo specific commit
       bit undo <branch_name>      # Delete specific branch
     """
+    from .history import HistoryError
+    
     try:
         if target:
             _targeted_undo(target)
@@ -1042,107 +1239,140 @@ def undo(interactive: bool, target: Optional[str]):
         print_error(f"Failed to undo: {e}")
 
 
+def _format_save_details(details: Dict[str, Any]) -> str:
+    """Format save details as the quoted commit message."""
+    message = details.get('message', '')
+    return f'"{message}"'
+
+
+def _format_switch_details(details: Dict[str, Any]) -> str:
+    """Format switch details as from → to (branch or short commit)."""
+    from_branch = details.get('from_branch', '')
+    to_commit = details.get('to_commit', '')
+    if to_commit:
+        return f"{from_branch} → {to_commit[:8]}"
+    return f"{from_branch} → {details.get('to_branch', '')}"
+
+
+def _format_push_details(details: Dict[str, Any]) -> str:
+    """Format push details as the target branch."""
+    return f"to {details.get('branch', '')}" + (" (force)" if details.get('force') else "")
+
+
+def _format_pull_details(details: Dict[str, Any]) -> str:
+    """Format pull details as the source branch."""
+    return f"from {details.get('branch', '')}" + (" (rebase)" if details.get('rebase') else "")
+
+
+def _format_stash_details(details: Dict[str, Any]) -> str:
+    """Format stash details as the quoted stash message."""
+    message = details.get('message', '')
+    return f'"{message}"' if message else "untitled"
+
+
+def _format_init_details(details: Dict[str, Any]) -> str:
+    """Format init details as the project name and remote status."""
+    project_name = details.get('project_name', 'repository')
+    return project_name + (" with remote" if details.get('remote_created') else " (local only)")
+
+
+# Action type -> formatter for its details dict; other types fall back to repr
+_ACTION_DETAIL_FORMATTERS = {
+    'save': _format_save_details,
+    'switch': _format_switch_details,
+    'push': _format_push_details,
+    'pull': _format_pull_details,
+    'stash': _format_stash_details,
+    'init': _format_init_details,
+}
+
+
+def _render_action_details(action: Dict[str, Any]) -> str:
+    """Render the details of a history action as one short line."""
+    details = action.get('details', {})
+    formatter = _ACTION_DETAIL_FORMATTERS.get(action['action_type'])
+    if formatter is None:
+        return str(details)[:50]
+    return formatter(details)
+
+
+def _relative_time(then: float, now: float) -> str:
+    """Describe then relative to now ("3h ago"), or as a date after a week.
+    
+    Both are epoch seconds, so bucketing is integer arithmetic; only dates
+    more than a week old are converted to calendar form.
+    """
+    seconds = int(now - then)
+    days = seconds // 86400
+    
+    if days > 7:
+        return time.strftime('%Y-%m-%d', time.localtime(then))
+    elif days > 0:
+        return f"{days}d ago"
+    elif seconds > 3600:
+        return f"{seconds // 3600}h ago"
+    elif seconds > 60:
+        return f"{seconds // 60}m ago"
+    return "just now"
+
+
+def _format_action(action: Dict[str, Any], now: float) -> tuple:
+    """Format a history action for display.
+    
+    Args:
+        action: Action record from the history manager
+        now: Reference time for the relative timestamp, in epoch seconds
+        
+    Returns:
+        Tuple of (details, relative time) strings
+    """
+    # History already imports datetime, so this adds no startup cost
+    from datetime import datetime
+    
+    # Calculate relative time; fromisoformat takes the 'T' separator as-is
+    timestamp = action['timestamp'][:19]
+    try:
+        time_str = _relative_time(datetime.fromisoformat(timestamp).timestamp(), now)
+    except ValueError:
+        time_str = timestamp.replace('T', ' ')
+    
+    return _render_action_details(action), time_str
+
+
 def _interactive_undo():
     """Interactive undo that lets user select which action to undo."""
     try:
         # Get recent actions that can be undone
-        actions = history_manager.get_history(20)  # Get more actions for selection
+        actions = _history().get_history(20)  # Get more actions for selection
         
         if not actions:
             print_info("No actions to undo.")
             return
         
-        # Filter actions that can be undone (have undo commands or are known types)
-        undoable_actions = []
-        for action in reversed(actions):  # Most recent first
-            action_type = action['action_type']
-            has_undo_command = action.get('undo_command') is not None
-            
-            # Actions we know how to undo
-            known_undoable = action_type in ['save', 'merge', 'push', 'pull', 'stash', 'switch', 'init']
-            
-            if has_undo_command or known_undoable:
-                undoable_actions.append(action)
+        # Filter actions that can be undone (have undo commands or are known
+        # types), most recent first
+        undoable_actions = [
+            action for action in reversed(actions)
+            if action['action_type'] in _UNDOABLE_ACTIONS or action.get('undo_command') is not None
+        ]
         
         if not undoable_actions:
             print_info("No undoable actions found.")
             return
         
-        # Format actions for selection with human-readable details
-        from datetime import datetime
+        # Format each action once; the menu and the undo preview share the result
+        now = time.time()
         choices = []
-        
-        for i, action in enumerate(undoable_actions):
-            action_id = action['id']
-            action_type = action['action_type']
-            
-            # Calculate relative time
-            timestamp_str = action['timestamp'][:19].replace('T', ' ')
-            try:
-                action_time = datetime.fromisoformat(timestamp_str)
-                now = datetime.now()
-                diff = now - action_time
-                total_seconds = diff.total_seconds()
-                
-                if diff.days > 7:
-                    time_str = timestamp_str.split(' ')[0]
-                elif diff.days > 0:
-                    time_str = f"{diff.days}d ago"
-                elif total_seconds > 3600:
-                    hours = int(total_seconds // 3600)
-                    time_str = f"{hours}h ago"
-                elif total_seconds > 60:
-                    minutes = int(total_seconds // 60)
-                    time_str = f"{minutes}m ago"
-                else:
-                    time_str = "just now"
-            except:
-                time_str = timestamp_str
-            
-            # Format details
-            details_dict = action.get('details', {})
-            if action_type == 'save':
-                message = details_dict.get('message', '')
-                details = f'"{message}"'
-            elif action_type == 'switch':
-                from_branch = details_dict.get('from_branch', '')
-                to_branch = details_dict.get('to_branch', '')
-                to_commit = details_dict.get('to_commit', '')
-                if to_commit:
-                    details = f"{from_branch} → {to_commit[:8]}"
-                else:
-                    details = f"{from_branch} → {to_branch}"
-            elif action_type == 'push':
-                branch = details_dict.get('branch', '')
-                force = details_dict.get('force', False)
-                details = f"to {branch}" + (" (force)" if force else "")
-            elif action_type == 'pull':
-                branch = details_dict.get('branch', '')
-                rebase = details_dict.get('rebase', False)
-                details = f"from {branch}" + (" (rebase)" if rebase else "")
-            elif action_type == 'stash':
-                message = details_dict.get('message', '')
-                details = f'"{message}"' if message else "untitled"
-            elif action_type == 'init':
-                project_name = details_dict.get('project_name', 'repository')
-                has_remote = details_dict.get('remote_created', False)
-                details = f"{project_name}" + (" with remote" if has_remote else " (local only)")
-            else:
-                details = str(details_dict)[:50]
-            
-            # Create choice display
-            choice_text = f"{action_type.upper()}: {details} ({time_str})"
-            choices.append((action, choice_text))
-        
-        if not choices:
-            print_info("No undoable actions found.")
-            return
+        for action in undoable_actions:
+            details, time_str = _format_action(action, now)
+            choices.append((action, details, time_str))
         
         # Show selection menu with rewind explanation
         print_info("Select action to undo (will rewind from most recent down to selected action):")
         selected_index = select_undo_point(
             "Choose undo point:",
-            [choice[1] for choice in choices]
+            [f"{action['action_type'].upper()}: {details} ({time_str})"
+             for action, details, time_str in choices]
         )
         
         if selected_index is None:
@@ -1157,32 +1387,8 @@ def _interactive_undo():
         
         # Show what will be undone
         print_info(f"This will undo {len(actions_to_undo)} action(s):")
-        for i, action in enumerate(actions_to_undo):
-            action_type = action['action_type']
-            details_dict = action.get('details', {})
-            if action_type == 'save':
-                message = details_dict.get('message', '')
-                details = f'"{message}"'
-            elif action_type == 'switch':
-                from_branch = details_dict.get('from_branch', '')
-                to_branch = details_dict.get('to_branch', '')
-                to_commit = details_dict.get('to_commit', '')
-                if to_commit:
-                    details = f"{from_branch} → {to_commit[:8]}"
-                else:
-                    details = f"{from_branch} → {to_branch}"
-            elif action_type == 'push':
-                branch = details_dict.get('branch', '')
-                force = details_dict.get('force', False)
-                details = f"to {branch}" + (" (force)" if force else "")
-            elif action_type == 'init':
-                project_name = details_dict.get('project_name', 'repository')
-                has_remote = details_dict.get('remote_created', False)
-                details = f"{project_name}" + (" with remote" if has_remote else " (local only)")
-            else:
-                details = str(details_dict)[:30]
-            
-            print_info(f"  {i+1}. {action_type.upper()}: {details}")
+        for i, (action, details, _) in enumerate(choices[:selected_index + 1]):
+            print_info(f"  {i+1}. {action['action_type'].upper()}: {details}")
         
         # Confirm the undo
         if not confirm(f"Undo these {len(actions_to_undo)} actions?", default=True):
@@ -1199,10 +1405,9 @@ def _interactive_undo():
                 print_warning(f"Failed to undo {action['action_type']}: {e}")
                 break
         
-        # Remove all successfully undone actions from history
+        # Remove all successfully undone actions from history in one rewrite
         if successful_undos > 0:
-            for action in actions_to_undo[:successful_undos]:
-                history_manager.remove_action(action['id'])
+            _history().remove_actions([action['id'] for action in actions_to_undo[:successful_undos]])
             
             if successful_undos == len(actions_to_undo):
                 print_success(f"Successfully undid {successful_undos} actions.")
@@ -1215,7 +1420,7 @@ def _interactive_undo():
 
 def _single_undo():
     """Undo just the last action (original behavior)."""
-    last_action = history_manager.get_last_action()
+    last_action = _history().get_last_action()
     if not last_action:
         print_info("No actions to undo.")
         return
@@ -1228,62 +1433,75 @@ def _single_undo():
     _perform_undo(last_action)
     
     # Remove the action from history
-    history_manager.remove_last_action()
+    _history().remove_last_action()
+
+
+# Action type -> (git arguments, success message) for undos that are a single git call
+_UNDO_COMMANDS = {
+    'save': (['reset', '--soft', 'HEAD~1'], "Undid last save (commit)"),
+    'merge': (['reset', '--hard', 'ORIG_HEAD'], "Undid last merge"),
+    'pull': (['reset', '--hard', 'HEAD@{1}'], "Undid last pull"),
+    'stash': (['stash', 'pop'], "Undid stash (restored changes)"),
+}
+
+
+def _undo_push(action):
+    """Undo a push by force-pushing the local state back to the remote."""
+    if action.get('undo_details', {}).get('dangerous'):
+        if not require_confirmation("undo push", action['details'].get('branch', ''), "extreme"):
+            return
+    
+    run_git_command(['push', '--force'])
+    print_success("Undid push (forced remote update)")
+
+
+def _undo_switch(action):
+    """Switch back to the branch recorded in the action's undo command."""
+    undo_command = action.get('undo_command')
+    if not undo_command:
+        print_warning("Don't know how to undo action type: switch")
+        return
+    
+    # Extract branch name from undo command
+    if 'git switch' in undo_command:
+        branch = undo_command.split()[-1]
+        run_git_command(['switch', branch])
+        _repo_info.cache_clear()
+        print_success(f"Switched back to {branch}")
+
+
+# Action type -> handler for undos that need confirmation or extra parsing;
+# lambdas because some handlers are defined further down
+_UNDO_HANDLERS = {
+    'push': lambda action: _undo_push(action),
+    'switch': lambda action: _undo_switch(action),
+    'init': lambda action: _undo_init(action),
+}
+
+# Action types _perform_undo knows how to undo without a stored undo command
+_UNDOABLE_ACTIONS = frozenset(_UNDO_HANDLERS).union(_UNDO_COMMANDS)
 
 
 def _perform_undo(action):
     """Perform the actual undo operation for a given action."""
     action_type = action['action_type']
-    details = action['details']
-    undo_command = action.get('undo_command')
-    undo_details = action.get('undo_details', {})
-    
-    # Handle different undo scenarios
-    if action_type == 'save':
-        run_git_command(['reset', '--soft', 'HEAD~1'])
-        print_success("Undid last save (commit)")
-    
-    elif action_type == 'merge':
-        run_git_command(['reset', '--hard', 'ORIG_HEAD'])
-        print_success("Undid last merge")
-    
-    elif action_type == 'push':
-        if undo_details.get('dangerous'):
-            if not require_confirmation("undo push", details.get('branch', ''), "extreme"):
-                return
-        
-        run_git_command(['push', '--force'])
-        print_success("Undid push (forced remote update)")
-    
-    elif action_type == 'pull':
-        run_git_command(['reset', '--hard', 'HEAD@{1}'])
-        print_success("Undid last pull")
-    
-    elif action_type == 'stash':
-        run_git_command(['stash', 'pop'])
-        print_success("Undid stash (restored changes)")
-    
-    elif action_type == 'switch' and undo_command:
-        # Extract branch name from undo command
-        if 'git switch' in undo_command:
-            branch = undo_command.split()[-1]
-            run_git_command(['switch', branch])
-            print_success(f"Switched back to {branch}")
-    
-    elif action_type == 'init':
-        _undo_init(action)
     
+    handler = _UNDO_HANDLERS.get(action_type)
+    if handler is not None:
+        handler(action)
+    elif action_type in _UNDO_COMMANDS:
+        git_args, message = _UNDO_COMMANDS[action_type]
+        run_git_command(git_args)
+        _invalidate_repo_snapshot()
+        print_success(message)
     else:
         print_warning(f"Don't know how to undo action type: {action_type}")
 
 
+@_requires_repo
 def _targeted_undo(target: str):
     """Undo a specific commit or delete a specific branch."""
     try:
-        if not is_git_repository():
-            print_error("Not in a Git repository.")
-            return
-        
         # Determine what type of target this is
         target_type = _identify_undo_target(target)
         
@@ -1302,27 +1520,12 @@ def _targeted_undo(target: str):
 def _identify_undo_target(target: str) -> str:
     """Identify whether target is a commit hash or branch name."""
     # Check if it's a branch (local or remote)
-    try:
-        branches_output, _, _ = run_git_command(['branch', '-a'])
-        for line in branches_output.split('\n'):
-            line = line.strip().lstrip('* ')
-            # Check both local and remote branch names
-            if line == target or line == f"remotes/origin/{target}":
-                return 'branch'
-            # Also check without the remotes/origin/ prefix
-            if line.startswith('remotes/origin/') and line[15:] == target:
-                return 'branch'
-    except GitError:
-        pass
-    
-    # Check if it looks like a commit hash (4+ hex characters)
-    if len(target) >= 4 and all(c in '0123456789abcdef' for c in target.lower()):
-        # Verify it's actually a valid commit
-        try:
-            run_git_command(['rev-parse', target])
-            return 'commit'
-        except GitError:
-            pass
+    if _branch_exists(target):
+        return 'branch'
+    
+    # Check if it looks like a commit hash and is actually a valid commit
+    if _is_commit_hash(target):
+        return 'commit'
     
     return 'unknown'
 
@@ -1332,8 +1535,10 @@ def _undo_specific_commit(commit_hash: str):
     try:
         # First, let's see if this commit exists and get its details
         try:
-            commit_info, _, _ = run_git_command(['log', '-1', '--pretty=format:%h|%s|%an', commit_hash])
-            hash_part, message, author = commit_info.split('|', 2)
+            # Unit-separated fields with the subject last, so a '|' or any
+            # other character in the subject cannot shift the author
+            commit_info, _, _ = run_git_command(['log', '-1', '--pretty=format:%h%x1f%an%x1f%s', commit_hash])
+            hash_part, author, message = commit_info.split('\x1f', 2)
         except GitError:
             print_error(f"Commit '{commit_hash}' not found.")
             return
@@ -1342,14 +1547,10 @@ def _undo_specific_commit(commit_hash: str):
         
         # Check if this is the HEAD commit (most recent)
         try:
-            head_hash, _, _ = run_git_command(['rev-parse', 'HEAD'])
-            head_short, _, _ = run_git_command(['rev-parse', '--short', 'HEAD'])
+            head = git_session.object_info('HEAD')
             
             # Check if the provided hash matches HEAD (either full or abbreviated)
-            if (head_hash.lower().startswith(commit_hash.lower()) or 
-                head_short.lower().startswith(commit_hash.lower()) or
-                commit_hash.lower() == head_hash.lower() or 
-                commit_hash.lower() == head_short.lower()):
+            if head and head[0].startswith(commit_hash.lower()):
                 # This is the HEAD commit, use reset --soft like normal undo
                 if not confirm(f"This will undo the most recent commit. Continue?", default=True):
                     return
@@ -1384,7 +1585,7 @@ def _undo_specific_commit(commit_hash: str):
             print_success(f"Created revert commit for {hash_part}")
             
             # Log this action for potential undo
-            history_manager.log_action(
+            _history().log_action(
                 "revert",
                 {"commit": commit_hash, "message": message},
                 undo_command=f"git reset --hard HEAD~1"
@@ -1396,10 +1597,15 @@ def _undo_specific_commit(commit_hash: str):
             if not require_confirmation("rewrite history", f"remove commit {hash_part}", "extreme"):
                 return
             
-            # Find the parent of the commit to rebase from
+            # Find the parent of the commit to rebase from, through the
+            # cat-file process already running for the HEAD check above
+            parent = git_session.object_info(f'{commit_hash}^')
+            if parent is None:
+                print_error(f"Cannot start interactive rebase: commit {hash_part} has no parent.")
+                return
+            
             try:
-                parent_hash, _, _ = run_git_command(['rev-parse', f'{commit_hash}^'])
-                run_git_command(['rebase', '--interactive', parent_hash])
+                run_git_command(['rebase', '--interactive', parent[0]])
                 print_success(f"Started interactive rebase to remove commit {hash_part}")
                 print_info("Complete the rebase by removing the target commit line and saving.")
             except GitError as e:
@@ -1412,7 +1618,7 @@ def _undo_specific_commit(commit_hash: str):
 def _delete_branch(branch_name: str):
     """Delete a specific branch."""
     try:
-        current_branch = get_current_branch()
+        current_branch = _repo_info().branch
         
         # Prevent deleting the current branch
         if branch_name == current_branch:
@@ -1420,17 +1626,14 @@ def _delete_branch(branch_name: str):
             return
         
         # Prevent deleting main/master branches
-        if branch_name in ['main', 'master', 'develop']:
+        if branch_name in _protected_branches():
             print_warning(f"Attempting to delete protected branch '{branch_name}'!")
             if not require_confirmation("delete protected branch", branch_name, "extreme"):
                 return
         
         # Check if it's a local branch
         try:
-            branches_output, _, _ = run_git_command(['branch'])
-            local_branches = [line.strip().lstrip('* ') for line in branches_output.split('\n') if line.strip()]
-            
-            if branch_name in local_branches:
+            if git_session.object_info(f'refs/heads/{branch_name}') is not None:
                 # Check if branch has unmerged changes
                 try:
                     run_git_command(['branch', '-d', branch_name])  # Try safe delete first
@@ -1446,7 +1649,7 @@ def _delete_branch(branch_name: str):
                         return
                 
                 # Log the action
-                history_manager.log_action(
+                _history().log_action(
                     "delete_branch",
                     {"branch": branch_name, "type": "local"},
                     undo_command=f"git switch -c {branch_name}"
@@ -1460,17 +1663,13 @@ def _delete_branch(branch_name: str):
         
         # Ask if they also want to delete the remote branch
         try:
-            remote_branches_output, _, _ = run_git_command(['branch', '-r'])
-            remote_branches = [line.strip().replace('origin/', '') for line in remote_branches_output.split('\n') 
-                             if line.strip() and 'origin/' in line]
-            
-            if branch_name in remote_branches:
+            if git_session.object_info(f'refs/remotes/origin/{branch_name}') is not None:
                 if confirm(f"Also delete remote branch 'origin/{branch_name}'?", default=False):
                     run_git_command(['push', 'origin', '--delete', branch_name])
                     print_success(f"Deleted remote branch 'origin/{branch_name}'")
                     
                     # Log the remote deletion
-                    history_manager.log_action(
+                    _history().log_action(
                         "delete_branch",
                         {"branch": branch_name, "type": "remote"},
                         undo_command=f"git push origin {branch_name}"
@@ -1533,7 +1732,6 @@ def _undo_init(action):
     try:
         git_dir = project_path / '.git'
         if git_dir.exists():
-            import shutil
             shutil.rmtree(git_dir)
             print_success("Removed local Git repository")
     except Exception as e:
@@ -1558,6 +1756,8 @@ def _undo_init(action):
 
 def _delete_remote_repository(owner: str, repo_name: str):
     """Delete a remote repository via GitHub API."""
+    from .integrations import GitHubClient
+    
     try:
         # Get current account and token
         current_account = config_manager.get_current_account()
@@ -1576,6 +1776,68 @@ def _delete_remote_repository(owner: str, repo_name: str):
         raise Exception(f"GitHub API error: {e}")
 
 
+def _origin_repo() -> Optional[tuple]:
+    """Return (owner, repo) for the origin remote, or None if it is not on GitHub.
+    
+    Raises:
+        GitError: If there is no origin remote
+    """
+    from .integrations import GitHubClient
+    
+    return GitHubClient.parse_repo_url(git_session.query(['remote', 'get-url', 'origin']))
+
+
+def _require_origin_repo() -> Optional[tuple]:
+    """Return (owner, repo) for the origin remote, printing an error if unavailable.
+    
+    The origin lookup fails outside a repository, so it doubles as the
+    repository check and commands that only need the remote skip the
+    separate rev-parse probe.
+    
+    Raises:
+        GitError: If the repository has no origin remote
+    """
+    try:
+        repo_info = _origin_repo()
+    except GitError as e:
+        if 'not a git repository' in e.stderr.lower():
+            print_error("Not in a Git repository.")
+            return None
+        raise
+    
+    if not repo_info:
+        print_error("Could not parse repository URL. Only GitHub repositories are supported.")
+    return repo_info
+
+
+def _github_context(prompt_for_token: bool = False) -> Optional[tuple]:
+    """Return (GitHubClient, owner, repo) for the origin remote.
+    
+    Shared preamble of the GitHub commands. The client is created without a
+    token if none is stored, unless prompt_for_token asks for one (and stores
+    it). Prints an error and returns None if the context is unavailable.
+    
+    Raises:
+        GitError: If the repository has no origin remote
+    """
+    from .integrations import GitHubClient
+    
+    repo_info = _require_origin_repo()
+    if not repo_info:
+        return None
+    
+    current_account = config_manager.get_current_account()
+    token = config_manager.get_credential(current_account)
+    if not token and prompt_for_token:
+        token = prompt_password(f"Enter GitHub token for {current_account}: ")
+        if not token:
+            print_error("No token provided.")
+            return None
+        config_manager.store_credential(current_account, token)
+    
+    return (GitHubClient(token),) + tuple(repo_info)
+
+
 @main.group()
 def pr():
     """Manage pull requests."""
@@ -1586,14 +1848,13 @@ def pr():
 @click.option('--title', '-t', help='Pull request title')
 @click.option('--body', '-b', help='Pull request body')
 @click.option('--base', default='main', help='Base branch for the pull request')
+@_requires_repo
 def pr_create(title: Optional[str], body: Optional[str], base: str):
     """Create a new pull request."""
+    from .integrations import IntegrationError
+    
     try:
-        if not is_git_repository():
-            print_error("Not in a Git repository.")
-            return
-        
-        current_branch = get_current_branch()
+        current_branch = _repo_info().branch
         if not current_branch or current_branch == base:
             print_error(f"Cannot create PR from {base} branch. Switch to a feature branch first.")
             return
@@ -1602,28 +1863,12 @@ def pr_create(title: Optional[str], body: Optional[str], base: str):
         print_info(f"Pushing branch '{current_branch}'...")
         run_git_command(['push', '-u', 'origin', current_branch])
         
-        # Get repository info
-        remote_url = run_git_command(['remote', 'get-url', 'origin'])[0]
-        repo_info = GitHubClient.parse_repo_url(remote_url)
-        if not repo_info:
-            print_error("Could not parse repository URL. Only GitHub repositories are supported.")
+        # Get repository info and an authenticated client
+        context = _github_context(prompt_for_token=True)
+        if not context:
             return
         
-        repo_owner, repo_name = repo_info
-        
-        # Get credentials
-        current_account = config_manager.get_current_account()
-        token = config_manager.get_credential(current_account)
-        if not token:
-            token = prompt_password(f"Enter GitHub token for {current_account}: ")
-            if token:
-                config_manager.store_credential(current_account, token)
-            else:
-                print_error("No token provided.")
-                return
-        
-        # Create GitHub client
-        github = GitHubClient(token)
+        github, repo_owner, repo_name = context
         
         # Get PR details interactively if not provided
         if not title:
@@ -1647,49 +1892,38 @@ def pr_create(title: Optional[str], body: Optional[str], base: str):
         print_error(f"Failed to create pull request: {e}")
 
 
+# Pulls the displayed fields out of a pull request dict in one call
+_PR_ROW_FIELDS = itemgetter('number', 'title', 'user', 'state')
+
+
 @pr.command('list')
 @click.option('--state', default='open', type=click.Choice(['open', 'closed', 'all']))
 def pr_list(state: str):
     """List pull requests."""
+    from .integrations import IntegrationError
+    
     try:
-        if not is_git_repository():
-            print_error("Not in a Git repository.")
-            return
-        
-        # Get repository info
-        remote_url = run_git_command(['remote', 'get-url', 'origin'])[0]
-        repo_info = GitHubClient.parse_repo_url(remote_url)
-        if not repo_info:
-            print_error("Could not parse repository URL.")
+        # Get repository info (this also checks we are in a repository)
+        context = _github_context()
+        if not context:
             return
         
-        repo_owner, repo_name = repo_info
-        
-        # Get credentials
-        current_account = config_manager.get_current_account()
-        token = config_manager.get_credential(current_account)
-        if not token:
+        github, repo_owner, repo_name = context
+        if not github.token:
             print_error("No stored credentials. Run 'bit pr create' first or configure token.")
             return
         
-        # Create GitHub client and list PRs
-        github = GitHubClient(token)
-        prs = github.list_pull_requests(repo_owner, repo_name, state)
+        prs = github.list_pull_request_summaries(repo_owner, repo_name, state)
         
         if not prs:
             print_info(f"No {state} pull requests found.")
             return
         
         headers = ["#", "Title", "Author", "Status"]
-        rows = []
-        
-        for pr in prs:
-            number = str(pr['number'])
-            title = pr['title'][:50]
-            author = pr['user']['login']
-            status = pr['state']
-            
-            rows.append([number, title, author, status])
+        rows = [
+            [str(number), truncate_cells(title, 50), user['login'], status]
+            for number, title, user, status in map(_PR_ROW_FIELDS, prs)
+        ]
         
         display_table(f"Pull Requests ({state})", headers, rows)
         
@@ -1697,43 +1931,91 @@ def pr_list(state: str):
         print_error(f"Failed to list pull requests: {e}")
 
 
+# Local branch a PR is checked out into; named after the PR number, never the
+# author's branch name, so a PR cannot update an existing branch like 'main'
+_PR_BRANCH_FORMAT = 'pr-{}'
+
+
+# Commits fetched for a PR branch in a shallow clone, unless --full is given
+_PR_FETCH_DEPTH = 50
+
+
+def _common_git_dir() -> str:
+    """Return the git directory shared by all worktrees (where 'shallow' lives).
+    
+    A linked worktree's own git directory names it in a 'commondir' file.
+    """
+    git_dir = _repo_info().git_dir
+    try:
+        with open(os.path.join(git_dir, 'commondir'), encoding='utf-8') as f:
+            return os.path.normpath(os.path.join(git_dir, f.read().strip()))
+    except OSError:
+        return git_dir
+
+
 @pr.command('checkout')
 @click.argument('pr_number', type=int)
-def pr_checkout(pr_number: int):
+@click.option('--full', is_flag=True, help='Fetch the full branch history in a shallow clone')
+@_mutates_repo
+def pr_checkout(pr_number: int, full: bool):
     """Checkout the branch for a specific pull request."""
+    from .integrations import IntegrationError
+    
     try:
-        if not is_git_repository():
-            print_error("Not in a Git repository.")
-            return
-        
-        # Get repository info
-        remote_url = run_git_command(['remote', 'get-url', 'origin'])[0]
-        repo_info = GitHubClient.parse_repo_url(remote_url)
-        if not repo_info:
-            print_error("Could not parse repository URL.")
+        # Get repository info (this also checks we are in a repository)
+        context = _github_context()
+        if not context:
             return
         
-        repo_owner, repo_name = repo_info
+        github, repo_owner, repo_name = context
         
-        # Get credentials
-        current_account = config_manager.get_current_account()
-        token = config_manager.get_credential(current_account)
-        if not token:
-            print_error("No stored credentials.")
-            return
-        
-        # Get PR details
-        github = GitHubClient(token)
-        pr_data = github.get_pull_request(repo_owner, repo_name, pr_number)
+        # Get PR details: one small GraphQL query when authenticated; GraphQL
+        # needs a token, so without one fall back to the public REST endpoint
+        if github.token:
+            pr_data = github.get_pull_request_summary(repo_owner, repo_name, pr_number)
+        else:
+            print_info("No stored credentials; this only works for public repositories.")
+            pr_data = github.get_pull_request(repo_owner, repo_name, pr_number)
         
-        branch_name = pr_data['head']['ref']
         print_info(f"Checking out PR #{pr_number}: {pr_data['title']}")
         
-        # Fetch and checkout the branch
-        run_git_command(['fetch', 'origin', f'{branch_name}:{branch_name}'])
-        run_git_command(['switch', branch_name])
+        # Fetch via the PR ref (also works for PRs from forks) into FETCH_HEAD.
+        # Tags are never needed for a review. A shallow clone would pull the
+        # branch's whole history, so stay shallow there; --depth would turn
+        # a complete clone shallow, so it is not used otherwise.
+        fetch_cmd = ['fetch', '--no-tags']
+        if not full and os.path.exists(os.path.join(_common_git_dir(), 'shallow')):
+            fetch_cmd.append(f'--depth={_PR_FETCH_DEPTH}')
+        run_git_command(fetch_cmd + ['origin', f'pull/{pr_number}/head'])
+        
+        # Both ends resolved in one round trip to the cat-file session
+        branch_name = _PR_BRANCH_FORMAT.format(pr_number)
+        pr_info, local_info = git_session.object_infos(['FETCH_HEAD', f'refs/heads/{branch_name}'])
+        if pr_info is None:
+            print_error(f"Could not resolve the fetched head of PR #{pr_number}.")
+            return
+        pr_head = pr_info[0]
         
-        print_success(f"Checked out branch '{branch_name}' for PR #{pr_number}")
+        if local_info is None:
+            run_git_command(['switch', '-c', branch_name, pr_head])
+        elif local_info[0] == pr_head:
+            run_git_command(['switch', branch_name])
+        else:
+            # The author pushed since the last checkout: fast-forward, but
+            # never drop commits made on the local branch
+            _, _, returncode = run_git_command(
+                ['merge-base', '--is-ancestor', local_info[0], pr_head], check=False
+            )
+            if returncode != 0:
+                print_error(f"Branch '{branch_name}' has diverged from PR #{pr_number}. "
+                            f"Delete it (git branch -D {branch_name}) and try again.")
+                return
+            run_git_command(['switch', '-C', branch_name, pr_head])
+            print_info(f"Updated '{branch_name}' to the latest commits of PR #{pr_number}")
+        _repo_info.cache_clear()
+        
+        print_success(f"Checked out PR #{pr_number} ({pr_data['head']['ref']}) "
+                      f"as branch '{branch_name}'")
         
     except (GitError, IntegrationError) as e:
         print_error(f"Failed to checkout pull request: {e}")
@@ -1741,48 +2023,33 @@ def pr_checkout(pr_number: int):
 
 @main.command()
 @click.argument('issue_id', type=int)
+@_mutates_repo
 def workon(issue_id: int):
     """Start working on a specific issue."""
+    from .integrations import GitHubClient, IntegrationError
+    
     try:
-        if not is_git_repository():
-            print_error("Not in a Git repository.")
-            return
-        
-        # Get repository info
-        remote_url = run_git_command(['remote', 'get-url', 'origin'])[0]
-        repo_info = GitHubClient.parse_repo_url(remote_url)
-        if not repo_info:
-            print_error("Could not parse repository URL.")
+        # Get repository info (this also checks we are in a repository)
+        context = _github_context(prompt_for_token=True)
+        if not context:
             return
         
-        repo_owner, repo_name = repo_info
-        
-        # Get credentials
-        current_account = config_manager.get_current_account()
-        token = config_manager.get_credential(current_account)
-        if not token:
-            token = prompt_password(f"Enter GitHub token for {current_account}: ")
-            if token:
-                config_manager.store_credential(current_account, token)
-            else:
-                print_error("No token provided.")
-                return
+        github, repo_owner, repo_name = context
         
         # Get issue details and create branch
-        github = GitHubClient(token)
-        
         print_info(f"Fetching issue #{issue_id}...")
-        issue = github.get_issue(repo_owner, repo_name, issue_id)
+        issue = github.get_issue_summary(repo_owner, repo_name, issue_id)
         
         print_info(f"Issue: {issue['title']}")
         
-        # Create branch name from issue
-        branch_name = github.create_branch_from_issue(repo_owner, repo_name, issue_id)
+        # Create branch name from the issue we already have
+        branch_name = GitHubClient.branch_name_for_issue(issue, issue_id)
         
         print_info(f"Creating and switching to branch: {branch_name}")
         
         # Create and switch to the new branch
         run_git_command(['switch', '-c', branch_name])
+        _repo_info.cache_clear()
         
         print_success(f"Started working on issue #{issue_id}")
         print_info(f"Branch: {branch_name}")
@@ -1793,14 +2060,12 @@ def workon(issue_id: int):
 
 
 @main.command()
+@_requires_repo
+@_mutates_repo
 def sync():
     """Synchronize local and remote repository state."""
     try:
-        if not is_git_repository():
-            print_error("Not in a Git repository.")
-            return
-        
-        current_branch = get_current_branch()
+        current_branch = _repo_info().branch
         if not current_branch:
             print_error("Cannot sync in detached HEAD state.")
             return
@@ -1826,7 +2091,7 @@ def sync():
         print_success("Sync completed successfully!")
         
         # Log the action
-        history_manager.log_action(
+        _history().log_action(
             "sync",
             {"branch": current_branch},
             undo_command="git reset --hard HEAD@{1}"
@@ -1836,67 +2101,100 @@ def sync():
         print_error(f"Sync failed: {e}")
 
 
+# Graph output pieces built once: the header, and a bound formatter taking
+# the graph prefix followed by the four commit fields
+_GRAPH_HEADER = (f"\n{SYMBOLS['graph']} Repository Graph:", "=" * 60)
+_GRAPH_COMMIT_LINE = "{}{} {} {} {}".format
+
+
+# Commits shown by graph when no --limit is given, without and with --all
+_GRAPH_LIMIT = 10
+_GRAPH_ALL_LIMIT = 200
+
+
 @main.command()
 @click.option('--all', '-a', is_flag=True, help='Show all branches including remotes')
-def graph(all: bool):
+@click.option('--limit', '-n', type=click.IntRange(min=1),
+              help=f'Number of commits to show (default: {_GRAPH_LIMIT}, or {_GRAPH_ALL_LIMIT} with --all)')
+@_requires_repo
+def graph(all: bool, limit: Optional[int]):
     """Display a text-based graph of branch and merge history."""
     try:
-        if not is_git_repository():
-            print_error("Not in a Git repository.")
-            return
-        
-        # Build git log command
-        cmd = ['log', '--graph', '--pretty=format:%h|%an|%ar|%s', '--abbrev-commit']
+        # Build git log command; fields are separated by the ASCII unit
+        # separator, which cannot clash with graph lines or commit subjects
+        cmd = ['log', '--graph', '--pretty=format:%x1f%h%x1f%an%x1f%ar%x1f%s', '--abbrev-commit']
+        # Always bounded, so --all on a large history stays quick to walk and render
+        if limit is None:
+            limit = _GRAPH_ALL_LIMIT if all else _GRAPH_LIMIT
+        cmd.append(f'--max-count={limit}')
         if all:
             cmd.append('--all')
-        else:
-            cmd.extend(['-10'])  # Limit to 10 commits for readability
         
-        output, _, _ = run_git_command(cmd)
+        # Format lines as git produces them, writing them out in batches
+        # rather than one print() per line or one buffer for the whole log
+        lines = []
+        header_printed = False
+        for line in run_git_command_streaming(cmd):
+            if not header_printed:
+                lines.extend(_GRAPH_HEADER)
+                header_printed = True
+            
+            # The format is fixed, so one partition finds the graph prefix and
+            # one bounded split yields exactly the four commit fields
+            graph_part, sep, rest = line.partition('\x1f')
+            if not sep:
+                # Graph-only connector line
+                lines.append(line)
+            else:
+                lines.append(_GRAPH_COMMIT_LINE(graph_part, *rest.split('\x1f', 3)))
+            
+            if len(lines) >= _OUTPUT_BATCH_LINES:
+                _write_lines(lines)
+                lines = []
         
-        if not output:
+        if not header_printed:
             print_info("No commits found.")
             return
         
-        print(f"\n{SYMBOLS['graph']} Repository Graph:")
-        print("=" * 60)
-        
-        for line in output.split('\n'):
-            if '|' in line:
-                # Split the graph part from the commit info
-                graph_part = line.split('|')[0] if line.count('|') >= 4 else line
-                commit_info = '|'.join(line.split('|')[1:]) if line.count('|') >= 4 else ''
-                
-                if commit_info:
-                    parts = commit_info.split('|')
-                    if len(parts) >= 3:
-                        hash_part, author, time_ago = parts[0], parts[1], parts[2]
-                        message = '|'.join(parts[3:]) if len(parts) > 3 else ''
-                        
-                        print(f"{graph_part}[yellow]{hash_part}[/yellow] "
-                              f"[green]{author}[/green] [dim]{time_ago}[/dim] {message}")
-                    else:
-                        print(line)
-                else:
-                    print(line)
-            else:
-                print(line)
-        
-        print("=" * 60)
+        lines.append(_GRAPH_HEADER[1])
+        _write_lines(lines)
         
     except GitError as e:
-        print_error(f"Failed to show graph: {e}")
+        if _head_is_unborn():
+            print_info("No commits found.")
+        else:
+            print_error(f"Failed to show graph: {e}")
+
+
+def _merged_branches() -> List[str]:
+    """Return local branches merged into HEAD that cleanup may delete.
+    
+    The checked-out branch and protected branches are left out.
+    
+    Raises:
+        GitError: If the branches cannot be listed
+    """
+    output, _, _ = run_git_command_bytes([
+        'for-each-ref', '--merged', 'HEAD', '--format=%(HEAD)%(refname:lstrip=2)', 'refs/heads'
+    ])
+    # %(HEAD) prefixes each name with '*' for the checked-out branch
+    # (which cannot be deleted) and ' ' otherwise
+    # (split on '\n' only: splitlines would also break on characters
+    # such as U+2028 that are legal in branch names)
+    protected = _protected_branches()
+    return [
+        line[1:] for line in _decode_path(output).split('\n')
+        if line.startswith(' ') and line[1:] not in protected
+    ]
 
 
 @main.command()
 @click.option('--dry-run', is_flag=True, help='Show what would be cleaned without doing it')
+@_requires_repo
+@_mutates_repo
 def cleanup(dry_run: bool):
     """Perform repository housekeeping tasks."""
     try:
-        if not is_git_repository():
-            print_error("Not in a Git repository.")
-            return
-        
         if dry_run:
             print_info("Dry run mode - showing what would be cleaned:")
         else:
@@ -1906,21 +2204,17 @@ def cleanup(dry_run: bool):
         
         # Check for merged branches that can be deleted
         try:
-            merged_output, _, _ = run_git_command(['branch', '--merged'])
-            merged_branches = []
-            for line in merged_output.split('\n'):
-                branch = line.strip().lstrip('* ')
-                if branch and branch not in ['main', 'master', 'develop']:
-                    merged_branches.append(branch)
-            
+            merged_branches = _merged_branches()
             if merged_branches:
                 tasks.append(("Delete merged branches", merged_branches))
         except GitError:
             pass
         
-        # Check for stale remote branches
+        # Prune stale remote branches when there is an origin. No dry-run
+        # probe: it contacts the remote just to decide whether to list this,
+        # and the real prune is cheap when nothing is stale
         try:
-            run_git_command(['remote', 'prune', 'origin', '--dry-run'])
+            git_session.query(['remote', 'get-url', 'origin'])
             tasks.append(("Prune stale remote branches", ["git remote prune origin"]))
         except GitError:
             pass
@@ -1943,13 +2237,25 @@ def cleanup(dry_run: bool):
         for task_name, items in tasks:
             if task_name == "Delete merged branches":
                 if confirm(f"Delete {len(items)} merged branches?"):
-                    for branch in items:
-                        run_git_command(['branch', '-d', branch])
+                    # One call for every branch; git deletes what it can and
+                    # reports the rest, so a single refusal doesn't abort cleanup
+                    _, stderr, returncode = run_git_command(['branch', '-d', *items], check=False)
+                    if returncode == 0:
+                        deleted = items
+                    else:
+                        # git's messages are translated, so see which refs are gone
+                        print_warning(stderr)
+                        remaining = git_session.object_infos([f'refs/heads/{branch}' for branch in items])
+                        deleted = [branch for branch, info in zip(items, remaining) if info is None]
+                    for branch in deleted:
                         print(f"  Deleted branch: {branch}")
             
             elif task_name == "Prune stale remote branches":
-                run_git_command(['remote', 'prune', 'origin'])
-                print("  Pruned stale remote branches")
+                _, stderr, returncode = run_git_command(['remote', 'prune', 'origin'], check=False)
+                if returncode == 0:
+                    print("  Pruned stale remote branches")
+                else:
+                    print_warning(f"Could not prune stale remote branches: {stderr}")
             
             elif task_name == "Run garbage collection":
                 run_git_command(['gc'])
@@ -1973,7 +2279,7 @@ def clone(repository_url: Optional[str]):
             # Interactive clone selection
             _interactive_clone()
             
-    except (GitError, IntegrationError, ConfigError) as e:
+    except (GitError, ConfigError) as e:
         print_error(f"Failed to clone repository: {e}")
 
 
@@ -2046,14 +2352,8 @@ def _interactive_clone():
 def _get_clipboard_git_url() -> Optional[str]:
     """Check clipboard for a valid git repository URL."""
     try:
-        import subprocess
-        import platform
-        import re
-        
-        system = platform.system()
-        
         # Get clipboard content based on OS
-        if system == "Windows":
+        if _SYSTEM == "Windows":
             try:
                 import win32clipboard
                 win32clipboard.OpenClipboard()
@@ -2068,7 +2368,7 @@ def _get_clipboard_git_url() -> Optional[str]:
                     capture_output=True, text=True
                 )
                 data = result.stdout.strip() if result.returncode == 0 else ""
-        elif system == "Darwin":  # macOS
+        elif _SYSTEM == "Darwin":  # macOS
             result = subprocess.run(["pbpaste"], capture_output=True, text=True)
             data = result.stdout.strip() if result.returncode == 0 else ""
         else:  # Linux/Unix
@@ -2104,6 +2404,8 @@ def _get_clipboard_git_url() -> Optional[str]:
 
 def _get_user_repositories() -> List[Dict[str, Any]]:
     """Get list of user's repositories from GitHub."""
+    from .integrations import GitHubClient, IntegrationError
+    
     try:
         # Get current account configuration
         current_account = config_manager.get_current_account()
@@ -2140,9 +2442,7 @@ def _perform_clone(repository_url: str):
         final_url = _convert_to_ssh_if_available(repository_url)
         
         # Extract repository name from URL for directory name
-        import re
-        
-        # Extract repo name from various URL formats
+        # (various URL formats)
         patterns = [
             r'.*/([\w\-\.]+)\.git/?$',
             r'.*/([\w\-\.]+)/?$',
@@ -2193,8 +2493,6 @@ def _perform_clone(repository_url: str):
 
 def _convert_to_ssh_if_available(url: str) -> str:
     """Convert HTTPS GitHub URL to SSH if SSH keys are available."""
-    import re
-    
     # Only convert if SSH keys are available
     if not _check_ssh_key_availability():
         return url
@@ -2218,9 +2516,6 @@ def _convert_to_ssh_if_available(url: str) -> str:
 def _open_in_editor(directory_path: Path):
     """Open the directory in the user's configured default text editor."""
     try:
-        import subprocess
-        import platform
-        
         # Get the configured editor from config
         editor = config_manager.get_default_editor()
         
@@ -2229,25 +2524,10 @@ def _open_in_editor(directory_path: Path):
             print_info("No editor configured. Set 'defaults.editor' in your config file.")
             return
         
-        system = platform.system()
-        
-        # Check if the configured editor exists
-        try:
-            if system == "Windows":
-                # Check if command exists
-                result = subprocess.run(["where", editor], 
-                                      capture_output=True, text=True)
-            else:
-                result = subprocess.run(["which", editor], 
-                                      capture_output=True, text=True)
-            
-            if result.returncode != 0:
-                print_info(f"Repository cloned to: {directory_path}")
-                print_warning(f"Configured editor '{editor}' not found in PATH.")
-                return
-        except FileNotFoundError:
+        # Check if the configured editor exists (PATH lookup in-process, no `which`/`where`)
+        if not shutil.which(editor):
             print_info(f"Repository cloned to: {directory_path}")
-            print_warning(f"Configured editor '{editor}' not found.")
+            print_warning(f"Configured editor '{editor}' not found in PATH.")
             return
         
         # Try to open with the configured editor
@@ -2267,44 +2547,45 @@ def _open_in_editor(directory_path: Path):
         print_warning("Could not open directory in text editor.")
 
 
+# Fallback editors for `bit config` on Linux and other Unix-like systems
+_CONFIG_EDITORS = (
+    "code",      # VS Code
+    "nano",      # Nano (usually available)
+    "vim",       # Vim
+    "gedit",     # GNOME Text Editor
+    "kate",      # KDE Text Editor
+    "xdg-open",  # Default application
+)
+
+# The user's preferred editor (from $EDITOR, fixed per process) ahead of the fallbacks
+_EDITOR_CANDIDATES = tuple(filter(None, (os.environ.get("EDITOR"),))) + _CONFIG_EDITORS
+
+
 @main.command()
 def config():
     """Open the BetterGit configuration file for editing."""
     try:
         config_file_path = config_manager.config_file
         
-        # Ensure config file exists
-        if not config_file_path.exists():
-            print_info("Configuration file doesn't exist. Creating default configuration...")
-            config_manager._ensure_config_exists()
+        # Ensure config file exists (it reports when it creates the default)
+        config_manager._ensure_config_exists()
         
         print_info(f"Opening configuration file: {config_file_path}")
         
         # Try to open with the system's default editor
-        import subprocess
-        import platform
-        
-        system = platform.system()
-        if system == "Windows":
+        if _SYSTEM == "Windows":
             # On Windows, use the default associated program
             os.startfile(str(config_file_path))
-        elif system == "Darwin":  # macOS
+        elif _SYSTEM == "Darwin":  # macOS
             subprocess.run(["open", str(config_file_path)])
         else:  # Linux and other Unix-like systems
-            # Try common editors in order of preference
-            editors = [
-                os.environ.get("EDITOR"),  # User's preferred editor
-                "code",      # VS Code
-                "nano",      # Nano (usually available)
-                "vim",       # Vim
-                "gedit",     # GNOME Text Editor
-                "kate",      # KDE Text Editor
-                "xdg-open"   # Default application
-            ]
+            # Try the user's preferred editor, then common ones in order
+            editors = _EDITOR_CANDIDATES
             
             for editor in editors:
-                if editor and subprocess.run(["which", editor], capture_output=True).returncode == 0:
-                    subprocess.run([editor, str(config_file_path)])
+                editor_path = shutil.which(editor)
+                if editor_path:
+                    subprocess.run([editor_path, str(config_file_path)])
                     break
             else:
                 print_warning("Could not find a suitable text editor. Please edit the file manually:")
@@ -2591,6 +2872,8 @@ def _interactive_token_setup():
 
 def _test_github_token(token: str):
     """Test GitHub token by making a simple API call."""
+    from .integrations import GitHubClient
+    
     try:
         print_info("🔍 Testing your GitHub token...")
         
@@ -1,12 +1,15 @@
 """Configuration management for BetterGit."""
 
+import json
 import os
-import yaml
-import keyring
 from pathlib import Path
 from typing import Dict, Any, Optional, List
 import logging
 
+# keyring is imported inside the credential methods: loading its backends
+# is slow and most commands never touch credentials. yaml is imported by
+# _yaml_load/_yaml_dump, since most commands read the parsed JSON sidecar.
+
 
 logger = logging.getLogger(__name__)
 
@@ -16,14 +19,34 @@ class ConfigError(Exception):
     pass
 
 
+def _yaml_load(stream) -> Any:
+    """Parse YAML with libyaml's C loader when PyYAML was built with it."""
+    import yaml
+    try:
+        return yaml.load(stream, Loader=getattr(yaml, 'CSafeLoader', yaml.SafeLoader))
+    except yaml.YAMLError as e:
+        raise ConfigError(f"Invalid YAML in config file: {e}")
+
+
+def _yaml_dump(data: Any, stream):
+    """Write YAML with libyaml's C dumper when PyYAML was built with it."""
+    import yaml
+    yaml.dump(data, stream, Dumper=getattr(yaml, 'CSafeDumper', yaml.SafeDumper),
+              default_flow_style=False, sort_keys=False)
+
+
 class ConfigManager:
     """Manages BetterGit configuration and secure credential storage."""
     
     def __init__(self):
         self.config_dir = Path.home() / ".config" / "bettergit"
         self.config_file = self.config_dir / "config.yml"
+        # Parsed config.yml as JSON, reused while config.yml is unchanged
+        self.config_cache_file = self.config_dir / "config.cache.json"
         self.keyring_service = "bettergit"
         self._config = None
+        # Keyring lookups can be slow IPC round-trips; remember results per process
+        self._credentials: Dict[str, Optional[str]] = {}
         self._ensure_config_exists()
     
     def _get_default_config(self) -> Dict[str, Any]:
@@ -50,40 +73,94 @@ class ConfigManager:
             }
         }
     
-    def _ensure_config_exists(self):
-        """Ensure the configuration directory and file exist."""
+    def _ensure_config_exists(self) -> bool:
+        """
+        Ensure the configuration directory and file exist.
+        
+        The usual case (file present) costs a single stat. A missing file is
+        created exclusively, so two commands starting at once cannot both
+        write it.
+        
+        Returns:
+            True if the default configuration was created
+        """
         try:
+            if self.config_file.exists():
+                return False
+            
             self.config_dir.mkdir(parents=True, exist_ok=True)
+            try:
+                f = open(self.config_file, 'x', encoding='utf-8')
+            except FileExistsError:
+                return False
             
-            if not self.config_file.exists():
-                logger.info(f"Creating default config at {self.config_file}")
-                default_config = self._get_default_config()
-                self._save_config(default_config)
-                print(f"Created default configuration at {self.config_file}")
-                print("Please edit this file to configure your accounts and preferences.")
+            logger.info(f"Creating default config at {self.config_file}")
+            with f:
+                _yaml_dump(self._get_default_config(), f)
+            print(f"Created default configuration at {self.config_file}")
+            print("Please edit this file to configure your accounts and preferences.")
+            return True
                 
         except Exception as e:
             raise ConfigError(f"Failed to create config directory: {e}")
     
     def _load_config(self) -> Dict[str, Any]:
-        """Load configuration from file."""
+        """
+        Load configuration from file.
+        
+        Parsing YAML costs far more than parsing JSON, so the parsed result is
+        kept in a JSON sidecar stamped with config.yml's size and mtime, and
+        reused by later commands until config.yml changes.
+        """
         try:
+            stat = os.stat(self.config_file)
+            stamp = [stat.st_mtime_ns, stat.st_size]
+            
+            cached = self._read_config_cache(stamp)
+            if cached is not None:
+                return cached
+            
             with open(self.config_file, 'r', encoding='utf-8') as f:
-                config = yaml.safe_load(f) or {}
-                return config
+                config = _yaml_load(f) or {}
+            self._write_config_cache(stamp, config)
+            return config
         except FileNotFoundError:
             logger.warning(f"Config file not found: {self.config_file}")
             return self._get_default_config()
-        except yaml.YAMLError as e:
-            raise ConfigError(f"Invalid YAML in config file: {e}")
+        except ConfigError:
+            raise
         except Exception as e:
             raise ConfigError(f"Failed to load config: {e}")
     
+    def _read_config_cache(self, stamp: List[int]) -> Optional[Dict[str, Any]]:
+        """Return the cached config if it was parsed from a file with this stamp."""
+        try:
+            with open(self.config_cache_file, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(cached, dict) or cached.get("stamp") != stamp:
+            return None
+        return cached.get("config")
+    
+    def _write_config_cache(self, stamp: List[int], config: Dict[str, Any]):
+        """Store a parsed config for later commands; skipped if JSON can't represent it."""
+        try:
+            encoded = json.dumps({"stamp": stamp, "config": config})
+            # YAML allows values JSON lacks (dates, non-string keys); such a
+            # config would not round-trip, so it is just parsed every time
+            if json.loads(encoded)["config"] != config:
+                return
+            with open(self.config_cache_file, 'w', encoding='utf-8') as f:
+                f.write(encoded)
+        except (OSError, TypeError, ValueError) as e:
+            logger.debug("Not caching parsed config: %s", e)
+    
     def _save_config(self, config: Dict[str, Any]):
         """Save configuration to file."""
         try:
             with open(self.config_file, 'w', encoding='utf-8') as f:
-                yaml.dump(config, f, default_flow_style=False, sort_keys=False)
+                _yaml_dump(config, f)
         except Exception as e:
             raise ConfigError(f"Failed to save config: {e}")
     
@@ -115,7 +192,8 @@ class ConfigManager:
     
     def get_accounts(self) -> Dict[str, Dict[str, Any]]:
         """Get all configured accounts."""
-        return self.config.get("accounts", {})
+        # An empty section in the YAML ("accounts:") loads as None
+        return self.config.get("accounts") or {}
     
     def get_account(self, alias: str) -> Optional[Dict[str, Any]]:
         """Get a specific account configuration."""
@@ -131,31 +209,44 @@ class ConfigManager:
     
     def get_default(self, key: str) -> Any:
         """Get a default setting value."""
-        return self.config.get("defaults", {}).get(key)
+        return (self.config.get("defaults") or {}).get(key)
     
     def get_issue_tracker_config(self) -> Dict[str, Any]:
         """Get issue tracker configuration."""
-        return self.config.get("issue_tracker", {})
+        return self.config.get("issue_tracker") or {}
     
     def store_credential(self, account_alias: str, token: str):
         """Securely store a credential for an account."""
         try:
+            import keyring
             keyring.set_password(self.keyring_service, account_alias, token)
+            self._credentials.pop(account_alias, None)
             logger.info(f"Stored credential for account: {account_alias}")
         except Exception as e:
             raise ConfigError(f"Failed to store credential: {e}")
     
     def get_credential(self, account_alias: str) -> Optional[str]:
-        """Retrieve a stored credential for an account."""
+        """Retrieve a stored credential for an account (cached after the first lookup)."""
+        if account_alias in self._credentials:
+            return self._credentials[account_alias]
+        
         try:
-            return keyring.get_password(self.keyring_service, account_alias)
+            import keyring
+            token = keyring.get_password(self.keyring_service, account_alias)
         except Exception as e:
+            # Remember the miss too: an unavailable backend fails the same way
+            # (often after a slow timeout) for every account in this process
             logger.warning(f"Failed to retrieve credential for {account_alias}: {e}")
-            return None
+            token = None
+        
+        self._credentials[account_alias] = token
+        return token
     
     def delete_credential(self, account_alias: str):
         """Delete a stored credential for an account."""
+        self._credentials.pop(account_alias, None)
         try:
+            import keyring
             keyring.delete_password(self.keyring_service, account_alias)
             logger.info(f"Deleted credential for account: {account_alias}")
         except Exception as e:
@@ -171,8 +262,7 @@ class ConfigManager:
     
     def get_default_editor(self) -> str:
         """Get the configured default editor command."""
-        defaults = self.config.get('defaults', {})
-        return defaults.get('editor', 'code')  # Default to 'code' if not configured
+        return self.get_default('editor') or 'code'  # Default to 'code' if not configured
 
 
 # Global config manager instance
@@ -1,5 +1,11 @@
 """Core module initialization."""
 
-from .git import run_git_command, GitError, is_git_repository, check_git_available
+from .git import (
+    run_git_command, run_git_command_bytes, run_git_command_streaming, GitError, is_git_repository, check_git_available,
+    RepoInfo, get_repo_info, RepoLock, GitSession, git_session
+)
 
-__all__ = ["run_git_command", "GitError", "is_git_repository", "check_git_available"]
+__all__ = [
+    "run_git_command", "run_git_command_bytes", "run_git_command_streaming", "GitError", "is_git_repository", "check_git_available",
+    "RepoInfo", "get_repo_info", "RepoLock", "GitSession", "git_session"
+]
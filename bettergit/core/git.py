@@ -1,14 +1,21 @@
 """Core Git wrapper functionality."""
 
+import atexit
+import os
 import subprocess
 import shutil
-import sys
-from typing import Tuple, List, Optional
+import tempfile
+import time
+from typing import Dict, Iterator, NamedTuple, Tuple, List, Optional
 import logging
 
 
 logger = logging.getLogger(__name__)
 
+# Skipping the fd-closing pass makes each spawn cheaper; git never inherits
+# anything it shouldn't here. Windows needs the default to avoid handle leaks.
+_CLOSE_FDS = os.name == 'nt'
+
 
 class GitError(Exception):
     """Raised when a Git command fails."""
@@ -25,8 +32,69 @@ def check_git_available() -> bool:
     return shutil.which("git") is not None
 
 
+def _safe_decode(data: bytes) -> str:
+    """Decode git output, trying common encodings before falling back to replacement."""
+    if not data:
+        return ""
+    for encoding in ['utf-8', 'cp1252', 'latin1']:
+        try:
+            return data.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+    # Last resort: decode with replacement characters
+    return data.decode('utf-8', errors='replace')
+
+
+def run_git_command_bytes(command: List[str], cwd: Optional[str] = None,
+                          check: bool = True, capture_stdout: bool = True,
+                          capture_stderr: bool = True,
+                          env: Optional[Dict[str, str]] = None) -> Tuple[bytes, bytes, int]:
+    """
+    Execute a Git command and return its raw output without decoding.
+    
+    Useful for NUL-delimited (-z) output, where only selected fields need
+    decoding and stripping would corrupt the data. env holds variables set
+    on top of the current environment.
+    
+    Returns:
+        Tuple of (stdout, stderr, returncode) as bytes; streams that were not
+        captured come back empty
+        
+    Raises:
+        GitError: If the command fails and check=True
+    """
+    if not check_git_available():
+        raise GitError(["git"], 1, "Git is not installed or not in PATH")
+    
+    full_command = ["git"] + command
+    logger.debug("Running Git command: %s", " ".join(full_command))
+    
+    try:
+        result = subprocess.run(
+            full_command,
+            stdout=subprocess.PIPE if capture_stdout else subprocess.DEVNULL,
+            stderr=subprocess.PIPE if capture_stderr else subprocess.DEVNULL,
+            close_fds=_CLOSE_FDS,
+            cwd=cwd,
+            env=dict(os.environ, **env) if env else None
+        )
+    except FileNotFoundError:
+        raise GitError(["git"], 1, "Git executable not found")
+    except Exception as e:
+        raise GitError(command, 1, str(e))
+    
+    logger.debug("Git command completed with return code %d", result.returncode)
+    
+    if check and result.returncode != 0:
+        raise GitError(command, result.returncode, _safe_decode(result.stderr).strip())
+    
+    return result.stdout or b"", result.stderr or b"", result.returncode
+
+
 def run_git_command(command: List[str], cwd: Optional[str] = None, 
-                   check: bool = True) -> Tuple[str, str, int]:
+                   check: bool = True, capture_stdout: bool = True,
+                   capture_stderr: bool = True,
+                   env: Optional[Dict[str, str]] = None) -> Tuple[str, str, int]:
     """
     Execute a Git command using subprocess.
     
@@ -34,6 +102,9 @@ def run_git_command(command: List[str], cwd: Optional[str] = None,
         command: List of command arguments (e.g., ['status', '--porcelain'])
         cwd: Working directory for the command
         check: If True, raise GitError on non-zero exit code
+        capture_stdout: If False, discard stdout instead of piping it back
+        capture_stderr: If False, discard stderr (GitError messages will be empty)
+        env: Extra environment variables for git (e.g. {'LC_ALL': 'C'})
         
     Returns:
         Tuple of (stdout, stderr, returncode)
@@ -41,55 +112,240 @@ def run_git_command(command: List[str], cwd: Optional[str] = None,
     Raises:
         GitError: If the command fails and check=True
     """
-    if not check_git_available():
-        raise GitError(["git"], 1, "Git is not installed or not in PATH")
-    
-    full_command = ["git"] + command
-    logger.debug(f"Running Git command: {' '.join(full_command)}")
-    
     try:
         # Use bytes mode and decode manually to handle encoding issues robustly
-        result = subprocess.run(
-            full_command,
-            capture_output=True,
-            cwd=cwd
+        raw_stdout, raw_stderr, returncode = run_git_command_bytes(
+            command, cwd=cwd, check=False,
+            capture_stdout=capture_stdout, capture_stderr=capture_stderr, env=env
         )
         
-        # Try to decode stdout/stderr with multiple encodings
-        def safe_decode(data):
-            if not data:
-                return ""
-            for encoding in ['utf-8', 'cp1252', 'latin1']:
-                try:
-                    return data.decode(encoding)
-                except UnicodeDecodeError:
-                    continue
-            # Last resort: decode with replacement characters
-            return data.decode('utf-8', errors='replace')
-        
-        stdout = safe_decode(result.stdout).strip()
-        stderr = safe_decode(result.stderr).strip()
-        returncode = result.returncode
-        
-        logger.debug(f"Git command completed with return code {returncode}")
+        stdout = _safe_decode(raw_stdout).strip()
+        stderr = _safe_decode(raw_stderr).strip()
+        
         if stdout:
-            logger.debug(f"stdout: {stdout}")
+            logger.debug("stdout: %s", stdout)
         if stderr:
-            logger.debug(f"stderr: {stderr}")
+            logger.debug("stderr: %s", stderr)
             
         if check and returncode != 0:
             raise GitError(command, returncode, stderr)
             
         return stdout, stderr, returncode
         
+    except GitError:
+        raise
+    except Exception as e:
+        raise GitError(command, 1, str(e))
+
+
+def run_git_command_streaming(command: List[str], cwd: Optional[str] = None,
+                              check: bool = True) -> Iterator[str]:
+    """
+    Execute a Git command and yield its stdout line by line as it is produced.
+    
+    Unlike run_git_command, the output is never held in memory all at once,
+    and the caller can start processing while git is still running.
+    
+    Yields:
+        Decoded lines without the trailing newline
+        
+    Raises:
+        GitError: If the command fails and check=True (after the output is consumed)
+    """
+    if not check_git_available():
+        raise GitError(["git"], 1, "Git is not installed or not in PATH")
+    
+    full_command = ["git"] + command
+    logger.debug("Streaming Git command: %s", " ".join(full_command))
+    
+    # stderr goes to a file rather than a pipe: nothing reads it until stdout
+    # is exhausted, and a full stderr pipe would stall git (and this loop)
+    stderr_file = tempfile.TemporaryFile()
+    try:
+        process = subprocess.Popen(
+            full_command,
+            stdout=subprocess.PIPE,
+            stderr=stderr_file,
+            close_fds=_CLOSE_FDS,
+            cwd=cwd
+        )
     except FileNotFoundError:
+        stderr_file.close()
         raise GitError(["git"], 1, "Git executable not found")
     except Exception as e:
+        stderr_file.close()
         raise GitError(command, 1, str(e))
+    
+    try:
+        for raw_line in process.stdout:
+            yield _safe_decode(raw_line).rstrip('\r\n')
+        
+        returncode = process.wait()
+        stderr_file.seek(0)
+        stderr = _safe_decode(stderr_file.read()).strip()
+    finally:
+        # Stop git if the caller abandoned the generator early
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+        stderr_file.close()
+    
+    logger.debug("Git command completed with return code %d", returncode)
+    if check and returncode != 0:
+        raise GitError(command, returncode, stderr)
+
+
+class RepoInfo(NamedTuple):
+    """Basic facts about the repository containing the working directory."""
+    in_repo: bool
+    branch: Optional[str]
+    top_level: Optional[str]
+    git_dir: Optional[str] = None
+
+
+# Environment variables that point git at a repository regardless of the
+# working directory
+_GIT_LOCATION_ENV = ('GIT_DIR', 'GIT_WORK_TREE', 'GIT_COMMON_DIR')
+
+
+def _outside_any_repository(path: Optional[str] = None) -> bool:
+    """
+    Check, without running git, that path cannot be inside a repository.
+    
+    Walks up looking for what git's discovery looks for: a `.git` entry, or
+    a directory that is itself a git directory (bare repository or inside
+    `.git`). Only a negative answer is trusted; anything found still goes
+    to git, which also applies ceilings, ownership checks and so on.
+    """
+    if any(os.environ.get(name) for name in _GIT_LOCATION_ENV):
+        return False
+    
+    current = os.path.abspath(path or os.getcwd())
+    while True:
+        if os.path.lexists(os.path.join(current, '.git')):
+            return False
+        if (os.path.isfile(os.path.join(current, 'HEAD'))
+                and os.path.isdir(os.path.join(current, 'objects'))):
+            return False
+        parent = os.path.dirname(current)
+        if parent == current:
+            return True
+        current = parent
+
+
+def get_repo_info(path: Optional[str] = None) -> RepoInfo:
+    """
+    Probe repository membership, current branch and top-level directory at once.
+    
+    Uses a single `git rev-parse` call instead of separate is_git_repository()
+    and get_current_branch() calls.
+    
+    Returns:
+        RepoInfo; branch is None in detached HEAD state
+    """
+    if _outside_any_repository(path):
+        return RepoInfo(False, None, None)
+    
+    try:
+        stdout, _, returncode = run_git_command(
+            ["rev-parse", "--is-inside-work-tree", "--absolute-git-dir",
+             "--show-toplevel", "--abbrev-ref", "HEAD"],
+            cwd=path,
+            check=False
+        )
+    except GitError:
+        return RepoInfo(False, None, None)
+    
+    lines = stdout.split('\n')
+    if lines[0] not in ("true", "false"):
+        return RepoInfo(False, None, None)
+    
+    git_dir = lines[1] if len(lines) > 1 else None
+    top_level = lines[2] if len(lines) > 2 else None
+    if returncode != 0:
+        # Unborn branch: HEAD has no commit yet, so ask for the branch name directly
+        return RepoInfo(True, get_current_branch(), top_level, git_dir)
+    
+    branch = lines[3] if len(lines) > 3 and lines[3] != "HEAD" else None
+    return RepoInfo(True, branch, top_level, git_dir)
+
+
+class RepoLock:
+    """
+    Advisory lock that serialises state-changing BetterGit commands per repository.
+    
+    Two `bit` processes mutating the same repository at once (or a command
+    racing an editor integration) otherwise fail on git's own index.lock.
+    The lock file lives in the git directory and is released when the
+    process exits, even on a crash. Re-entering in the same process is a no-op.
+    """
+    
+    # Lock files currently held by this process
+    _held = set()
+    
+    def __init__(self, git_dir: str, timeout: float = 30.0):
+        self.path = os.path.join(git_dir, "bettergit.lock")
+        self.timeout = timeout
+        self._file = None
+    
+    def __enter__(self):
+        if self.path in RepoLock._held:
+            return self
+        
+        self._file = open(self.path, "a+")
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                _lock_file(self._file)
+                break
+            except OSError:
+                if time.monotonic() >= deadline:
+                    self._file.close()
+                    self._file = None
+                    raise GitError(["lock"], 1, "Another BetterGit command is modifying this repository")
+                time.sleep(0.1)
+        
+        RepoLock._held.add(self.path)
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        if self._file is not None:
+            _unlock_file(self._file)
+            self._file.close()
+            self._file = None
+            RepoLock._held.discard(self.path)
+
+
+if os.name == 'nt':
+    import msvcrt
+    
+    def _lock_file(f):
+        """Take an exclusive lock on f without blocking (raises OSError if held)."""
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+    
+    def _unlock_file(f):
+        """Release the lock taken by _lock_file."""
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+else:
+    import fcntl
+    
+    def _lock_file(f):
+        """Take an exclusive lock on f without blocking (raises OSError if held)."""
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    
+    def _unlock_file(f):
+        """Release the lock taken by _lock_file."""
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
 
 
 def is_git_repository(path: Optional[str] = None) -> bool:
     """Check if the current directory (or specified path) is a Git repository."""
+    if _outside_any_repository(path):
+        return False
+    
     try:
         _, _, returncode = run_git_command(
             ["rev-parse", "--git-dir"], 
@@ -125,7 +381,9 @@ def get_repository_root(path: Optional[str] = None) -> Optional[str]:
 def has_uncommitted_changes() -> bool:
     """Check if there are uncommitted changes in the working directory."""
     try:
-        stdout, _, _ = run_git_command(["status", "--porcelain"])
+        # Same machine format the CLI parses; any entry means changes, so the
+        # raw bytes are only tested for emptiness, never decoded
+        stdout, _, _ = run_git_command_bytes(["status", "--porcelain=v2", "-z"])
         return bool(stdout)
     except GitError:
         return False
@@ -138,3 +396,114 @@ def get_remote_url(remote: str = "origin") -> Optional[str]:
         return stdout
     except GitError:
         return None
+
+
+class GitSession:
+    """
+    Per-process helper for read-only Git queries.
+    
+    Query results are remembered for the rest of the invocation, so commands
+    that ask the same question twice (remote URL, config values) fork once.
+    Object lookups go through a single long-lived `git cat-file --batch-check`
+    process instead of one process per lookup.
+    """
+    
+    # Most lookups written to the cat-file process before reading answers
+    QUERY_CHUNK = 256
+    
+    def __init__(self):
+        self._results: Dict[Tuple[str, Tuple[str, ...]], str] = {}
+        self._batch: Optional[subprocess.Popen] = None
+        self._batch_cwd: Optional[str] = None
+    
+    def query(self, command: List[str], cwd: Optional[str] = None) -> str:
+        """
+        Run a read-only Git command once per process and return its stdout.
+        
+        Raises:
+            GitError: If the command fails (failures are not cached)
+        """
+        key = (cwd or os.getcwd(), tuple(command))
+        if key not in self._results:
+            self._results[key] = run_git_command(command, cwd=cwd)[0]
+        return self._results[key]
+    
+    def object_info(self, rev: str) -> Optional[Tuple[str, str]]:
+        """
+        Resolve a revision through the persistent cat-file process.
+        
+        Returns:
+            Tuple of (object name, object type), or None if rev does not exist
+        """
+        return self.object_infos([rev])[0]
+    
+    def object_infos(self, revs: List[str]) -> List[Optional[Tuple[str, str]]]:
+        """
+        Resolve several revisions with one round trip to the cat-file process.
+        
+        All queries are written before any answer is read, so n lookups cost
+        one flush and one wait instead of n.
+        
+        Returns:
+            A (object name, object type) tuple or None for each rev, in order
+        """
+        # A newline would split one query into two and desynchronise answers
+        queries = [rev for rev in revs if '\n' not in rev]
+        answers = {}
+        if queries:
+            batch = self._batch_process()
+            # Bounded chunks, so unread answers can never fill the output pipe
+            # while we are still blocked writing queries
+            for start in range(0, len(queries), self.QUERY_CHUNK):
+                chunk = queries[start:start + self.QUERY_CHUNK]
+                batch.stdin.write(b''.join(rev.encode('utf-8') + b'\n' for rev in chunk))
+                batch.stdin.flush()
+                for rev in chunk:
+                    fields = batch.stdout.readline().split()
+                    # Found objects answer "<name> <type> <size>"; anything else is
+                    # "<rev> missing" / "<rev> ambiguous" (rev may contain spaces),
+                    # or the process went away
+                    answers[rev] = (
+                        (fields[0].decode('ascii'), fields[1].decode('ascii'))
+                        if len(fields) == 3 and fields[2].isdigit() else None
+                    )
+        return [answers.get(rev) for rev in revs]
+    
+    def _batch_process(self) -> subprocess.Popen:
+        """Start (or restart after a chdir) the cat-file helper process."""
+        cwd = os.getcwd()
+        if self._batch is not None and self._batch_cwd == cwd and self._batch.poll() is None:
+            return self._batch
+        
+        self.close()
+        if not check_git_available():
+            raise GitError(["git"], 1, "Git is not installed or not in PATH")
+        
+        logger.debug("Starting git cat-file --batch-check session")
+        self._batch = subprocess.Popen(
+            ["git", "cat-file", "--batch-check"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            close_fds=_CLOSE_FDS,
+            cwd=cwd
+        )
+        self._batch_cwd = cwd
+        return self._batch
+    
+    def invalidate(self):
+        """Forget cached query results (call after commands that change state)."""
+        self._results.clear()
+    
+    def close(self):
+        """Stop the cat-file helper process if it is running."""
+        if self._batch is not None:
+            self._batch.stdin.close()
+            self._batch.wait()
+            self._batch = None
+            self._batch_cwd = None
+
+
+# Global session instance, closed at interpreter exit
+git_session = GitSession()
+atexit.register(git_session.close)
@@ -1,12 +1,18 @@
 """Action history management for the undo functionality."""
 
+import atexit
 import json
-import time
+import os
+import queue
+import threading
 from datetime import datetime
+from itertools import islice
 from pathlib import Path
 from typing import Dict, Any, List, Optional
 import logging
 
+from .core.git import RepoLock
+
 
 logger = logging.getLogger(__name__)
 
@@ -17,44 +23,200 @@ class HistoryError(Exception):
 
 
 class ActionHistory:
-    """Manages the history of state-changing actions for undo functionality."""
+    """Manages the history of state-changing actions for undo functionality.
+    
+    Actions are stored one JSON object per line and only ever appended, so
+    logging an action never rewrites the file. Readers scan backwards from
+    the end of the file, and undo truncates it at the removed action.
+    
+    Writes happen on a background thread so logging never delays the command
+    that triggered it; reads wait for pending writes, and anything still
+    queued is written out at exit. The file is shared by every repository,
+    so numbering and rewrites happen under a lock held across bit processes.
+    """
+    
+    # Number of actions kept when the file is compacted
+    MAX_ACTIONS = 50
+    # Compact once the file grows past this size (about four times MAX_ACTIONS lines)
+    COMPACT_BYTES = 128 * 1024
+    # Block size for reading the file backwards
+    _TAIL_CHUNK = 8192
     
     def __init__(self):
         self.config_dir = Path.home() / ".config" / "bettergit"
-        self.history_file = self.config_dir / "history.json"
+        self.history_file = self.config_dir / "history.jsonl"
+        self.legacy_history_file = self.config_dir / "history.json"
+        self._append_file = None
+        self._pending = queue.Queue()
+        self._writer = None
         self._ensure_history_exists()
     
     def _ensure_history_exists(self):
-        """Ensure the history file exists."""
+        """Ensure the history file exists, migrating the old JSON array format."""
         try:
             self.config_dir.mkdir(parents=True, exist_ok=True)
-            if not self.history_file.exists():
-                self._save_history([])
+            if self.history_file.exists():
+                return
+            
+            history = []
+            if self.legacy_history_file.exists():
+                try:
+                    with open(self.legacy_history_file, 'r', encoding='utf-8') as f:
+                        history = json.load(f)
+                except json.JSONDecodeError as e:
+                    logger.warning(f"Invalid JSON in legacy history file, not migrating: {e}")
+            
+            self._save_history(history)
+            if self.legacy_history_file.exists():
+                self.legacy_history_file.unlink()
         except Exception as e:
             raise HistoryError(f"Failed to create history file: {e}")
     
-    def _load_history(self) -> List[Dict[str, Any]]:
-        """Load action history from file."""
+    def _flush(self):
+        """Write out buffered appends so readers see them."""
+        if self._append_file is not None:
+            self._append_file.flush()
+    
+    def flush(self):
+        """Wait for queued actions to be written, then flush the file."""
+        if self._writer is not None and threading.current_thread() is not self._writer:
+            self._pending.join()
+        self._flush()
+    
+    def _close(self):
+        """Close the append handle."""
+        if self._append_file is not None:
+            self._append_file.close()
+            self._append_file = None
+    
+    def _shutdown(self):
+        """Write out queued actions and close the file (registered with atexit)."""
+        self.flush()
+        self._close()
+    
+    def _append(self, action: Dict[str, Any]):
+        """Append one action, opening the file in append mode on first use."""
+        if self._append_file is None:
+            self._append_file = open(self.history_file, 'a', encoding='utf-8')
+        self._append_file.write(json.dumps(action) + '\n')
+    
+    def _locked(self) -> RepoLock:
+        """Exclusive lock on the history file, shared with other bit processes.
+        
+        Callers flush first, so the background writer is idle while the
+        lock is held.
+        """
+        return RepoLock(str(self.config_dir))
+    
+    def _write_pending(self):
+        """Background writer: append queued actions in order."""
+        while True:
+            entry = self._pending.get()
+            try:
+                self._write_action(*entry)
+            except Exception as e:
+                # Don't fail the main operation if history logging fails
+                logger.error(f"Failed to log action: {e}")
+            finally:
+                self._pending.task_done()
+    
+    def _write_action(self, timestamp: str, action_type: str, details: Dict[str, Any],
+                      undo_command: Optional[str], undo_details: Optional[Dict[str, Any]]):
+        """Number an action after the last one on file and append it.
+        
+        The line is flushed before the lock is released, so the next process
+        to number an action sees it.
+        """
+        with self._locked():
+            last_action = None
+            for _, last_action in self._iter_reversed():
+                break
+            
+            action = {
+                "id": last_action["id"] + 1 if last_action else 1,
+                "timestamp": timestamp,
+                "action_type": action_type,
+                "details": details,
+                "undo_command": undo_command,
+                "undo_details": undo_details or {}
+            }
+            
+            self._append(action)
+            self._flush()
+            self._compact_if_needed()
+        logger.info(f"Logged action: {action_type}")
+    
+    def _iter_reversed(self):
+        """Yield (offset, action) pairs from the newest action to the oldest.
+        
+        Reads the file backwards in fixed-size blocks, so looking at the last
+        few actions costs the same no matter how long the history is.
+        Lines that are not valid JSON (e.g. a torn write) are skipped.
+        """
+        self.flush()
         try:
-            if not self.history_file.exists():
-                return []
+            f = open(self.history_file, 'rb')
+        except FileNotFoundError:
+            return
+        
+        with f:
+            position = f.seek(0, os.SEEK_END)
+            remainder = b''
+            while position > 0:
+                read_size = min(self._TAIL_CHUNK, position)
+                position -= read_size
+                f.seek(position)
+                lines = (f.read(read_size) + remainder).split(b'\n')
+                
+                # The first piece may be a partial line; keep it for the next block
+                remainder = lines.pop(0)
+                offset = position + len(remainder) + 1
+                starts = []
+                for line in lines:
+                    starts.append(offset)
+                    offset += len(line) + 1
+                
+                for start, line in zip(reversed(starts), reversed(lines)):
+                    action = self._parse_line(line)
+                    if action is not None:
+                        yield start, action
             
-            with open(self.history_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except json.JSONDecodeError as e:
-            logger.warning(f"Invalid JSON in history file, resetting: {e}")
-            return []
-        except Exception as e:
-            raise HistoryError(f"Failed to load history: {e}")
+            action = self._parse_line(remainder)
+            if action is not None:
+                yield 0, action
+    
+    @staticmethod
+    def _parse_line(line: bytes) -> Optional[Dict[str, Any]]:
+        """Parse one JSONL line, returning None for blank or corrupt lines."""
+        if not line.strip():
+            return None
+        try:
+            return json.loads(line)
+        except ValueError:
+            logger.warning("Skipping invalid line in history file")
+            return None
+    
+    def _truncate(self, offset: int):
+        """Drop everything from byte offset onwards."""
+        self.flush()
+        with open(self.history_file, 'r+b') as f:
+            f.truncate(offset)
     
     def _save_history(self, history: List[Dict[str, Any]]):
-        """Save action history to file."""
+        """Rewrite the history file with the given actions."""
         try:
+            self._close()
             with open(self.history_file, 'w', encoding='utf-8') as f:
-                json.dump(history, f, indent=2)
+                for action in history:
+                    f.write(json.dumps(action) + '\n')
         except Exception as e:
             raise HistoryError(f"Failed to save history: {e}")
     
+    def _compact_if_needed(self):
+        """Keep only the most recent actions once the file gets large."""
+        if self.history_file.stat().st_size > self.COMPACT_BYTES:
+            self._save_history(self.get_history(self.MAX_ACTIONS))
+    
     def log_action(self, action_type: str, details: Dict[str, Any], 
                    undo_command: Optional[str] = None, 
                    undo_details: Optional[Dict[str, Any]] = None):
@@ -66,92 +228,106 @@ class ActionHistory:
             details: Details about the action performed
             undo_command: Command needed to undo this action
             undo_details: Additional details needed for undo
+        
+        The action is queued and written by a background thread.
         """
-        try:
-            history = self._load_history()
-            
-            action = {
-                "id": len(history) + 1,
-                "timestamp": datetime.now().isoformat(),
-                "action_type": action_type,
-                "details": details,
-                "undo_command": undo_command,
-                "undo_details": undo_details or {}
-            }
-            
-            history.append(action)
-            
-            # Keep only the last 50 actions to prevent file bloat
-            if len(history) > 50:
-                history = history[-50:]
-                # Renumber the actions
-                for i, action in enumerate(history):
-                    action["id"] = i + 1
-            
-            self._save_history(history)
-            logger.info(f"Logged action: {action_type}")
-            
-        except Exception as e:
-            # Don't fail the main operation if history logging fails
-            logger.error(f"Failed to log action: {e}")
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._write_pending, daemon=True)
+            self._writer.start()
+            atexit.register(self._shutdown)
+        
+        self._pending.put((datetime.now().isoformat(), action_type, details,
+                           undo_command, undo_details))
     
     def get_history(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
-        """Get the action history, optionally limited to recent actions."""
-        history = self._load_history()
-        if limit:
-            return history[-limit:]
+        """Get the most recent actions (at most MAX_ACTIONS), oldest first."""
+        limit = min(limit or self.MAX_ACTIONS, self.MAX_ACTIONS)
+        try:
+            history = list(islice((action for _, action in self._iter_reversed()), limit))
+        except Exception as e:
+            raise HistoryError(f"Failed to load history: {e}")
+        history.reverse()
         return history
     
     def get_last_action(self) -> Optional[Dict[str, Any]]:
         """Get the most recent action."""
-        history = self._load_history()
+        history = self.get_history(1)
         return history[-1] if history else None
     
     def remove_last_action(self) -> Optional[Dict[str, Any]]:
         """Remove and return the most recent action."""
         try:
-            history = self._load_history()
-            if not history:
+            self.flush()
+            with self._locked():
+                for offset, action in self._iter_reversed():
+                    self._truncate(offset)
+                    return action
                 return None
             
-            last_action = history.pop()
-            self._save_history(history)
-            return last_action
-            
         except Exception as e:
             raise HistoryError(f"Failed to remove last action: {e}")
     
     def remove_action(self, action_id: int) -> Optional[Dict[str, Any]]:
         """Remove an action with the specified ID and all actions after it."""
         try:
-            history = self._load_history()
-            if not history:
+            self.flush()
+            with self._locked():
+                for offset, action in self._iter_reversed():
+                    if action['id'] == action_id:
+                        self._truncate(offset)
+                        return action
                 return None
             
-            # Find the action with the given ID
-            action_index = None
-            for i, action in enumerate(history):
-                if action['id'] == action_id:
-                    action_index = i
-                    break
-            
-            if action_index is None:
-                return None
-            
-            # Remove the action and all actions after it
-            removed_action = history[action_index]
-            history = history[:action_index]
-            
-            self._save_history(history)
-            return removed_action
-            
         except Exception as e:
             raise HistoryError(f"Failed to remove action: {e}")
     
+    def remove_actions(self, action_ids: List[int]) -> List[Dict[str, Any]]:
+        """Remove the actions with the given IDs, keeping the ones around them.
+        
+        Only the file from the oldest removed action onwards is rewritten.
+        
+        Returns:
+            The removed actions, newest first
+        """
+        pending = set(action_ids)
+        removed, newer = [], []
+        offset = None
+        kept_count = 0
+        try:
+            self.flush()
+            with self._locked():
+                actions = self._iter_reversed()
+                for start, action in actions:
+                    if action['id'] in pending:
+                        pending.discard(action['id'])
+                        removed.append(action)
+                        offset = start
+                        kept_count = len(newer)
+                        if not pending:
+                            break
+                    else:
+                        newer.append(action)
+                actions.close()
+                
+                if offset is None:
+                    return []
+                
+                # Cut at the oldest removed action and put back the survivors after it
+                self._truncate(offset)
+                for action in reversed(newer[:kept_count]):
+                    self._append(action)
+                self._flush()
+                return removed
+            
+        except Exception as e:
+            raise HistoryError(f"Failed to remove actions: {e}")
+    
     def clear_history(self):
         """Clear all action history."""
         try:
-            self._save_history([])
+            self.flush()
+            with self._locked():
+                self._save_history([])
             logger.info("Cleared action history")
         except Exception as e:
             raise HistoryError(f"Failed to clear history: {e}")
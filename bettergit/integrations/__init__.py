@@ -1,6 +1,6 @@
 """Integration modules for third-party services."""
 
 from .github import GitHubClient
-from .base import IntegrationClient, IntegrationError
+from .base import IntegrationClient, IntegrationError, RateLimitError
 
-__all__ = ["GitHubClient", "IntegrationClient", "IntegrationError"]
+__all__ = ["GitHubClient", "IntegrationClient", "IntegrationError", "RateLimitError"]
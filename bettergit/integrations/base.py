@@ -1,8 +1,18 @@
 """Base classes for third-party integrations."""
 
+import atexit
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional, List
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Sequence
 import logging
 
 
@@ -14,13 +24,173 @@ class IntegrationError(Exception):
     pass
 
 
+class RateLimitError(IntegrationError):
+    """Raised when the API rate limit is exhausted until reset_at (epoch seconds)."""
+    
+    def __init__(self, message: str, reset_at: Optional[float] = None):
+        super().__init__(message)
+        self.reset_at = reset_at
+
+
+class HTTPCache:
+    """
+    On-disk store of API responses, shared across bit invocations.
+    
+    Replaying a stored ETag as If-None-Match lets the server answer
+    304 Not Modified, which GitHub does not count against the rate limit.
+    Entries also record when they were stored, so callers that accept
+    slightly stale data can skip the request entirely. Safe to use from
+    several request threads at once. Changes are kept in memory and
+    written out once, by save(), which runs at exit.
+    """
+    
+    # Oldest entries are dropped beyond this many
+    MAX_ENTRIES = 200
+    
+    def __init__(self, cache_file: Optional[Path] = None):
+        self.cache_file = cache_file or Path.home() / ".config" / "bettergit" / "http_cache.json"
+        self._entries: Optional[Dict[str, Dict[str, Any]]] = None
+        self._lock = threading.RLock()
+        self._dirty = False
+        self._save_registered = False
+    
+    @property
+    def entries(self) -> Dict[str, Dict[str, Any]]:
+        """Cached entries, loaded from disk on first use."""
+        if self._entries is None:
+            with self._lock:
+                if self._entries is None:
+                    try:
+                        with open(self.cache_file, 'r', encoding='utf-8') as f:
+                            self._entries = json.load(f)
+                    except (OSError, ValueError):
+                        self._entries = {}
+        return self._entries
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached {'etag', 'body', 'stored_at'} entry for key, if any."""
+        return self.entries.get(key)
+    
+    def get_fresh(self, key: str, max_age: float) -> Optional[Dict[str, Any]]:
+        """Return the entry for key only if it was stored within max_age seconds."""
+        entry = self.entries.get(key)
+        if entry and time.time() - entry.get("stored_at", 0) < max_age:
+            return entry
+        return None
+    
+    def store(self, key: str, etag: Optional[str], body: Any):
+        """Remember a response body (and its ETag, if any)."""
+        with self._lock:
+            entries = self.entries
+            entries.pop(key, None)
+            entries[key] = {"etag": etag, "body": body, "stored_at": time.time()}
+            while len(entries) > self.MAX_ENTRIES:
+                del entries[next(iter(entries))]
+            self._mark_dirty()
+    
+    def expire(self):
+        """Mark every entry stale (after a write); ETags stay usable for revalidation."""
+        with self._lock:
+            entries = self.entries
+            if not any(entry.get("stored_at") for entry in entries.values()):
+                return
+            for entry in entries.values():
+                entry["stored_at"] = 0
+            self._mark_dirty()
+    
+    def save(self):
+        """Write the cache file if anything changed since it was loaded."""
+        with self._lock:
+            if self._dirty:
+                self._write()
+                self._dirty = False
+    
+    def _mark_dirty(self):
+        """Note a change, arranging for the cache to be saved at exit."""
+        if not self._save_registered:
+            atexit.register(self.save)
+            self._save_registered = True
+        self._dirty = True
+    
+    def _write(self):
+        """Write all entries to the cache file.
+        
+        The entries go to a private (0600) temporary file that then replaces
+        the cache, so a crash or a concurrent bit never leaves it half written.
+        """
+        entries = self.entries
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self.cache_file.parent,
+                                             prefix=self.cache_file.name + '.', suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(entries, f)
+                os.replace(temp_path, self.cache_file)
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+        except OSError as e:
+            logger.warning(f"Failed to write HTTP cache: {e}")
+
+
+def _select_fields(value: Any, fields: Sequence[str]) -> Any:
+    """
+    Keep only the given dotted fields of a JSON value.
+    
+    Lists are filtered item by item, so 'labels.name' keeps just the name of
+    every label. A field that is absent stays absent.
+    """
+    if isinstance(value, list):
+        return [_select_fields(item, fields) for item in value]
+    if not isinstance(value, dict):
+        return value
+    
+    nested: Dict[str, List[str]] = {}
+    for field in fields:
+        key, _, rest = field.partition('.')
+        nested.setdefault(key, []).append(rest)
+    
+    return {
+        key: value[key] if '' in rests else _select_fields(value[key], rests)
+        for key, rests in nested.items() if key in value
+    }
+
+
+# Global HTTP cache instance shared by all integration clients
+http_cache = HTTPCache()
+
+
 class IntegrationClient(ABC):
     """Base class for third-party service integrations."""
     
+    # Rate-limit waits up to this many seconds are slept through; longer ones raise
+    MAX_RATE_LIMIT_WAIT = 60
+    
+    # Keep-alive pool sizing; a command talks to one API host, occasionally
+    # with a few concurrent requests
+    POOL_CONNECTIONS = 4
+    POOL_MAXSIZE = 8
+    
+    # (connect, read) timeouts in seconds; a dead host fails fast instead of
+    # hanging for the full read timeout
+    TIMEOUT = (3.05, 30)
+    
+    # Largest page size list endpoints accept
+    MAX_PER_PAGE = 100
+    
     def __init__(self, api_url: str, token: Optional[str] = None):
         self.api_url = api_url.rstrip('/')
         self.token = token
         self.session = requests.Session()
+        # Transient gateway errors on idempotent requests are retried with
+        # backoff; rate limits (403/429) are handled in _make_request instead
+        retry = Retry(total=3, backoff_factor=0.3, status_forcelist=(502, 503, 504),
+                      raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=self.POOL_CONNECTIONS, pool_maxsize=self.POOL_MAXSIZE,
+                              max_retries=retry)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
         if token:
             self._set_auth_headers()
     
@@ -31,18 +201,56 @@ class IntegrationClient(ABC):
     
     def _make_request(self, method: str, endpoint: str, 
                      data: Optional[Dict[str, Any]] = None,
-                     params: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
-        """Make an authenticated API request."""
+                     params: Optional[Dict[str, str]] = None,
+                     max_age: float = 0,
+                     cache_fields: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """
+        Make an authenticated API request.
+        
+        Responses are only cached when cache_fields names the (dotted) fields
+        the caller reads; just those are kept, on disk and in the returned
+        body, so the cache never holds whole API responses. Cached GET
+        responses are revalidated with their ETag instead of re-downloaded.
+        With max_age, a response cached less than max_age seconds ago is
+        returned without contacting the server; this also applies to
+        read-only POSTs such as GraphQL queries.
+        """
         try:
             url = f"{self.api_url}/{endpoint.lstrip('/')}"
             
-            response = self.session.request(
-                method=method.upper(),
-                url=url,
-                json=data,
-                params=params,
-                timeout=30
-            )
+            cache_key = None
+            cached = None
+            headers = None
+            if cache_fields and (method.upper() == "GET" or max_age):
+                cache_key = self._cache_key(url, params, data)
+                if max_age:
+                    fresh = http_cache.get_fresh(cache_key, max_age)
+                    if fresh:
+                        logger.debug(f"Using cached response for {url}")
+                        return fresh["body"]
+                cached = http_cache.get(cache_key)
+                if cached and cached.get("etag"):
+                    headers = {"If-None-Match": cached["etag"]}
+            
+            response = self._send(method, url, data, params, headers)
+            wait = self._rate_limit_wait(response)
+            if wait is not None:
+                reset_at = time.time() + wait
+                if wait > self.MAX_RATE_LIMIT_WAIT:
+                    reset = time.strftime("%H:%M:%S", time.localtime(reset_at))
+                    raise RateLimitError(f"API rate limit exceeded. Try again after {reset}.", reset_at)
+                logger.warning(f"API rate limit reached, retrying in {wait:.0f}s")
+                time.sleep(wait)
+                response = self._send(method, url, data, params, headers)
+                if self._rate_limit_wait(response) is not None:
+                    raise RateLimitError("API rate limit exceeded.", reset_at)
+            
+            if response.status_code == 304 and cached:
+                logger.debug(f"Not modified, using cached response for {url}")
+                if max_age:
+                    # Revalidated, so the entry is fresh again
+                    http_cache.store(cache_key, cached["etag"], cached["body"])
+                return cached["body"]
             
             if response.status_code == 401:
                 raise IntegrationError("Authentication failed. Please check your token.")
@@ -53,13 +261,99 @@ class IntegrationClient(ABC):
             elif not response.ok:
                 raise IntegrationError(f"API request failed: {response.status_code} {response.text}")
             
-            return response.json() if response.content else {}
+            body = response.json() if response.content else {}
+            if cache_key:
+                body = _select_fields(body, cache_fields)
+                etag = response.headers.get("ETag")
+                if etag or max_age:
+                    http_cache.store(cache_key, etag, body)
+            elif method.upper() != "GET":
+                # A write may have changed anything we have cached as fresh
+                http_cache.expire()
+            return body
             
         except requests.RequestException as e:
             raise IntegrationError(f"Network error: {e}")
         except ValueError as e:
             raise IntegrationError(f"Invalid JSON response: {e}")
     
+    def _get_pages(self, endpoint: str, params: Optional[Dict[str, Any]] = None,
+                   limit: int = 30, max_age: float = 0,
+                   cache_fields: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """
+        GET up to limit items from a paginated list endpoint.
+        
+        The first page shows whether there are more; the rest of the pages
+        needed for limit are then requested concurrently on the pooled
+        session instead of one round trip after another.
+        """
+        per_page = min(limit, self.MAX_PER_PAGE)
+        page_count = -(-limit // per_page)
+        
+        def fetch(page: int) -> List[Dict[str, Any]]:
+            page_params = dict(params or {}, per_page=per_page, page=page)
+            return self._make_request("GET", endpoint, params=page_params, max_age=max_age,
+                                      cache_fields=cache_fields)
+        
+        items = fetch(1)
+        if len(items) < per_page or page_count == 1:
+            return items[:limit]
+        
+        from concurrent.futures import ThreadPoolExecutor
+        
+        with ThreadPoolExecutor(max_workers=min(page_count - 1, self.POOL_MAXSIZE)) as executor:
+            for page in executor.map(fetch, range(2, page_count + 1)):
+                items.extend(page)
+                if len(page) < per_page:
+                    # Last page reached; any later pages are empty
+                    break
+        return items[:limit]
+    
+    def _send(self, method: str, url: str, data: Optional[Dict[str, Any]],
+              params: Optional[Dict[str, str]], headers: Optional[Dict[str, str]]) -> requests.Response:
+        """Send one request on the pooled session."""
+        return self.session.request(
+            method=method.upper(),
+            url=url,
+            json=data,
+            params=params,
+            headers=headers,
+            timeout=self.TIMEOUT
+        )
+    
+    @staticmethod
+    def _rate_limit_wait(response: requests.Response) -> Optional[float]:
+        """
+        Seconds to wait before retrying a rate-limited response, or None.
+        
+        Primary limits report X-RateLimit-Remaining: 0 with an epoch
+        X-RateLimit-Reset; secondary limits send Retry-After instead.
+        """
+        if response.status_code not in (403, 429):
+            return None
+        
+        retry_after = response.headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+        
+        if response.headers.get("X-RateLimit-Remaining") == "0":
+            try:
+                reset = float(response.headers["X-RateLimit-Reset"])
+            except (KeyError, ValueError):
+                return None
+            return max(reset - time.time(), 0.0) + 1
+        return None
+    
+    def _cache_key(self, url: str, params: Optional[Dict[str, str]],
+                   data: Optional[Dict[str, Any]] = None) -> str:
+        """Cache key for a request; responses differ per token, so it is included (hashed)."""
+        token_id = hashlib.sha256((self.token or "").encode()).hexdigest()[:16]
+        query = "&".join(f"{k}={v}" for k, v in sorted((params or {}).items()))
+        key = f"{token_id} {url}?{query}"
+        if data:
+            key += " " + json.dumps(data, sort_keys=True)
+        return key
+    
     @abstractmethod
     def create_repository(self, name: str, description: str = "", 
                          private: bool = True) -> Dict[str, Any]:
@@ -1,6 +1,7 @@
 """GitHub API integration."""
 
 from .base import IntegrationClient, IntegrationError
+from functools import lru_cache
 from typing import Dict, Any, List, Optional
 import re
 import logging
@@ -8,10 +9,63 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# REST-style state filter -> GraphQL PullRequestState values
+_PR_STATES = {
+    "open": ["OPEN"],
+    "closed": ["CLOSED", "MERGED"],
+    "all": ["OPEN", "CLOSED", "MERGED"],
+}
+
+# GitHub remote URL formats (ssh, https, with or without .git), most specific first
+_REPO_URL_PATTERNS = (
+    re.compile(r'github\.com[:/]([^/]+)/([^/]+?)(?:\.git)?/?$'),
+    re.compile(r'github\.com/([^/]+)/([^/]+)'),
+)
+
+_PULL_REQUESTS_QUERY = """
+query($owner: String!, $name: String!, $states: [PullRequestState!], $first: Int!) {
+  repository(owner: $owner, name: $name) {
+    pullRequests(states: $states, first: $first, orderBy: {field: CREATED_AT, direction: DESC}) {
+      nodes { number title state author { login } }
+    }
+  }
+}
+"""
+
+_PULL_REQUEST_QUERY = """
+query($owner: String!, $name: String!, $number: Int!) {
+  repository(owner: $owner, name: $name) {
+    pullRequest(number: $number) { title headRefName }
+  }
+}
+"""
+
+_ISSUE_QUERY = """
+query($owner: String!, $name: String!, $number: Int!) {
+  repository(owner: $owner, name: $name) {
+    issue(number: $number) {
+      title
+      labels(first: 20) { nodes { name } }
+    }
+  }
+}
+"""
+
 
 class GitHubClient(IntegrationClient):
     """GitHub API client for repository and pull request management."""
     
+    # Seconds a cached response is reused without asking GitHub: listings
+    # change often, a single issue or pull request rarely does
+    LIST_MAX_AGE = 60
+    ITEM_MAX_AGE = 300
+    
+    # Fields kept from cached REST responses: what bit reads, nothing more
+    PULL_REQUEST_FIELDS = ("number", "title", "state", "user.login", "head.ref")
+    ISSUE_FIELDS = ("number", "title", "state", "labels.name")
+    # GraphQL queries already select only the fields they need
+    GRAPHQL_FIELDS = ("data", "errors")
+    
     def __init__(self, token: Optional[str] = None):
         super().__init__("https://api.github.com", token)
     
@@ -61,23 +115,30 @@ class GitHubClient(IntegrationClient):
         return self._make_request("POST", endpoint, data=data)
     
     def list_pull_requests(self, repo_owner: str, repo_name: str,
-                          state: str = "open") -> List[Dict[str, Any]]:
-        """List pull requests for a repository."""
+                          state: str = "open", limit: int = 30) -> List[Dict[str, Any]]:
+        """
+        List up to limit pull requests for a repository, fetching pages concurrently.
+        
+        Each pull request has only the PULL_REQUEST_FIELDS.
+        """
         endpoint = f"/repos/{repo_owner}/{repo_name}/pulls"
         params = {"state": state}
-        return self._make_request("GET", endpoint, params=params)
+        return self._get_pages(endpoint, params, limit, max_age=self.LIST_MAX_AGE,
+                               cache_fields=self.PULL_REQUEST_FIELDS)
     
     def get_pull_request(self, repo_owner: str, repo_name: str,
                         pr_number: int) -> Dict[str, Any]:
-        """Get a specific pull request."""
+        """Get a specific pull request (only the PULL_REQUEST_FIELDS)."""
         endpoint = f"/repos/{repo_owner}/{repo_name}/pulls/{pr_number}"
-        return self._make_request("GET", endpoint)
+        return self._make_request("GET", endpoint, max_age=self.ITEM_MAX_AGE,
+                                  cache_fields=self.PULL_REQUEST_FIELDS)
     
     def get_issue(self, repo_owner: str, repo_name: str,
                  issue_number: int) -> Dict[str, Any]:
-        """Get a specific issue."""
+        """Get a specific issue (only the ISSUE_FIELDS)."""
         endpoint = f"/repos/{repo_owner}/{repo_name}/issues/{issue_number}"
-        return self._make_request("GET", endpoint)
+        return self._make_request("GET", endpoint, max_age=self.ITEM_MAX_AGE,
+                                  cache_fields=self.ISSUE_FIELDS)
     
     def list_issues(self, repo_owner: str, repo_name: str,
                    state: str = "open", labels: Optional[str] = None) -> List[Dict[str, Any]]:
@@ -94,21 +155,18 @@ class GitHubClient(IntegrationClient):
         return self._make_request("GET", endpoint)
     
     @staticmethod
+    @lru_cache(maxsize=32)
     def parse_repo_url(url: str) -> Optional[tuple]:
         """
         Parse a GitHub repository URL to extract owner and repo name.
         
+        Results are memoized; the same remote is parsed by every PR command.
+        
         Returns:
             Tuple of (owner, repo_name) or None if not a valid GitHub URL
         """
-        # Handle various GitHub URL formats
-        patterns = [
-            r'github\.com[:/]([^/]+)/([^/]+?)(?:\.git)?/?$',
-            r'github\.com/([^/]+)/([^/]+)',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, url)
+        for pattern in _REPO_URL_PATTERNS:
+            match = pattern.search(url)
             if match:
                 owner, repo = match.groups()
                 # Remove .git suffix if present
@@ -128,31 +186,137 @@ class GitHubClient(IntegrationClient):
         """
         try:
             issue = self.get_issue(repo_owner, repo_name, issue_number)
-            title = issue.get('title', f'issue-{issue_number}')
-            
-            # Clean up the title to create a valid branch name
-            # Remove non-alphanumeric characters and replace with hyphens
-            clean_title = re.sub(r'[^a-zA-Z0-9\s]', '', title)
-            clean_title = re.sub(r'\s+', '-', clean_title.strip())
-            clean_title = clean_title.lower()[:50]  # Limit length
-            
-            # Determine branch prefix based on issue labels
-            labels = [label['name'].lower() for label in issue.get('labels', [])]
-            
-            if 'bug' in labels:
-                prefix = 'fix'
-            elif 'enhancement' in labels or 'feature' in labels:
-                prefix = 'feature'
-            elif 'documentation' in labels:
-                prefix = 'docs'
-            else:
-                prefix = 'feature'
-            
-            return f"{prefix}/{issue_number}-{clean_title}"
-            
         except IntegrationError:
             # Fallback if we can't fetch the issue
             return f"feature/{issue_number}-work-on-issue"
+        
+        return self.branch_name_for_issue(issue, issue_number)
+    
+    @staticmethod
+    def branch_name_for_issue(issue: Dict[str, Any], issue_number: int) -> str:
+        """
+        Build a branch name from already-fetched issue data.
+        
+        Args:
+            issue: Issue with 'title' and 'labels' (each a dict with 'name')
+            issue_number: The issue number
+            
+        Returns:
+            Branch name such as 'fix/42-crash-on-start'
+        """
+        title = issue.get('title', f'issue-{issue_number}')
+        
+        # Clean up the title to create a valid branch name
+        # Remove non-alphanumeric characters and replace with hyphens
+        clean_title = re.sub(r'[^a-zA-Z0-9\s]', '', title)
+        clean_title = re.sub(r'\s+', '-', clean_title.strip())
+        clean_title = clean_title.lower()[:50]  # Limit length
+        
+        # Determine branch prefix based on issue labels
+        labels = [label['name'].lower() for label in issue.get('labels', [])]
+        
+        if 'bug' in labels:
+            prefix = 'fix'
+        elif 'enhancement' in labels or 'feature' in labels:
+            prefix = 'feature'
+        elif 'documentation' in labels:
+            prefix = 'docs'
+        else:
+            prefix = 'feature'
+        
+        return f"{prefix}/{issue_number}-{clean_title}"
+    
+    def graphql(self, query: str, variables: Optional[Dict[str, Any]] = None,
+                max_age: float = 0) -> Dict[str, Any]:
+        """
+        Run a GraphQL query against the GitHub API.
+        
+        A single query can replace several REST calls and costs one
+        rate-limit point. With max_age, a result cached less than max_age
+        seconds ago is reused without a request.
+        
+        Returns:
+            The 'data' member of the response
+            
+        Raises:
+            IntegrationError: If the request fails or the response has errors
+        """
+        response = self._make_request("POST", "/graphql",
+                                      data={"query": query, "variables": variables or {}},
+                                      max_age=max_age, cache_fields=self.GRAPHQL_FIELDS)
+        if response.get("errors"):
+            messages = "; ".join(error.get("message", "unknown error") for error in response["errors"])
+            raise IntegrationError(f"GraphQL query failed: {messages}")
+        return response.get("data") or {}
+    
+    def list_pull_request_summaries(self, repo_owner: str, repo_name: str,
+                                    state: str = "open", limit: int = 30) -> List[Dict[str, Any]]:
+        """
+        List pull requests with just the fields needed for display.
+        
+        Uses one GraphQL query and returns REST-shaped dicts ('number',
+        'title', 'user.login', 'state'), newest first like the REST listing.
+        Merged pull requests are reported as 'closed', as REST does.
+        """
+        states = _PR_STATES[state]
+        data = self.graphql(_PULL_REQUESTS_QUERY, {
+            "owner": repo_owner,
+            "name": repo_name,
+            "states": states,
+            "first": min(limit, 100)
+        }, max_age=self.LIST_MAX_AGE)
+        repository = data.get("repository")
+        if repository is None:
+            raise IntegrationError("Resource not found.")
+        
+        return [
+            {
+                "number": node["number"],
+                "title": node["title"],
+                "user": {"login": (node.get("author") or {}).get("login", "ghost")},
+                "state": "open" if node["state"] == "OPEN" else "closed"
+            }
+            for node in repository["pullRequests"]["nodes"]
+        ]
+    
+    def get_pull_request_summary(self, repo_owner: str, repo_name: str,
+                                 pr_number: int) -> Dict[str, Any]:
+        """
+        Get a pull request's title and head branch in one small GraphQL query.
+        
+        Returns:
+            REST-shaped dict with 'title' and 'head.ref'
+        """
+        data = self.graphql(_PULL_REQUEST_QUERY, {
+            "owner": repo_owner,
+            "name": repo_name,
+            "number": pr_number
+        }, max_age=self.ITEM_MAX_AGE)
+        pull_request = (data.get("repository") or {}).get("pullRequest")
+        if pull_request is None:
+            raise IntegrationError("Resource not found.")
+        
+        return {"title": pull_request["title"], "head": {"ref": pull_request["headRefName"]}}
+    
+    def get_issue_summary(self, repo_owner: str, repo_name: str,
+                          issue_number: int) -> Dict[str, Any]:
+        """
+        Get an issue's title and labels in one GraphQL round trip.
+        
+        Returns:
+            REST-shaped dict with 'title' and 'labels', usable with
+            branch_name_for_issue()
+        """
+        data = self.graphql(_ISSUE_QUERY, {
+            "owner": repo_owner,
+            "name": repo_name,
+            "number": issue_number
+        }, max_age=self.ITEM_MAX_AGE)
+        issue = (data.get("repository") or {}).get("issue")
+        if issue is None:
+            raise IntegrationError("Resource not found.")
+        
+        return {"title": issue["title"], "labels": issue["labels"]["nodes"]}
     
     def delete_repository(self, repo_owner: str, repo_name: str) -> bool:
         """
@@ -1,16 +1,19 @@
 """User interface utilities for interactive prompts and displays."""
 
-import inquirer
 from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
 from rich.text import Text
 from rich.tree import Tree
+from rich.cells import cell_len, set_cell_size
+from rich.markup import escape
+from itertools import chain, islice
 from typing import List, Dict, Any, Optional, Union
 import logging
 import sys
-import os
-import emoji
+
+# inquirer (and its terminal library) is imported by the prompt functions
+# themselves; non-interactive commands never need it
 
 
 logger = logging.getLogger(__name__)
@@ -125,6 +128,7 @@ def print_info(message: str):
 def confirm(message: str, default: bool = False) -> bool:
     """Show a yes/no confirmation prompt."""
     try:
+        import inquirer
         questions = [
             inquirer.Confirm('confirm', message=message, default=default)
         ]
@@ -140,6 +144,7 @@ def confirm(message: str, default: bool = False) -> bool:
 def prompt_text(message: str, default: str = "") -> str:
     """Show a text input prompt."""
     try:
+        import inquirer
         questions = [
             inquirer.Text('input', message=message, default=default)
         ]
@@ -155,6 +160,7 @@ def prompt_text(message: str, default: str = "") -> str:
 def prompt_password(message: str) -> str:
     """Show a password input prompt (hidden input)."""
     try:
+        import inquirer
         questions = [
             inquirer.Password('password', message=message)
         ]
@@ -174,7 +180,8 @@ def select_from_list(message: str, choices: List[Union[str, tuple]],
         if not choices:
             print_warning("No options available to select from.")
             return None
-            
+        
+        import inquirer
         questions = [
             inquirer.List('choice', message=message, choices=choices, default=default)
         ]
@@ -333,6 +340,8 @@ def select_multiple(message: str, choices: List[Union[str, tuple]]) -> List[str]
             print_warning("No options available to select from.")
             return []
             
+        import inquirer
+            
         questions = [
             inquirer.Checkbox('choices', message=message, choices=choices)
         ]
@@ -345,9 +354,24 @@ def select_multiple(message: str, choices: List[Union[str, tuple]]) -> List[str]
         return []
 
 
+def truncate_cells(text: str, width: int) -> str:
+    """Cut text to at most width terminal cells (wide characters count as two)."""
+    if text.isascii():
+        # One cell per character, so plain slicing is exact
+        return text[:width]
+    if cell_len(text) <= width:
+        return text
+    return set_cell_size(text, width).rstrip()
+
+
 def display_table(title: str, headers: List[str], rows: List[List[str]], 
                   show_lines: bool = True):
-    """Display a formatted table."""
+    """Display a formatted table.
+    
+    Cells are plain text: they often hold remote data such as pull request
+    titles, so they skip rich's markup parser (which would also reject a
+    stray closing tag like '[/b]').
+    """
     try:
         table = Table(title=title, show_lines=show_lines)
         
@@ -355,7 +379,7 @@ def display_table(title: str, headers: List[str], rows: List[List[str]],
             table.add_column(header, style="cyan", no_wrap=True)
         
         for row in rows:
-            table.add_row(*row)
+            table.add_row(*map(Text, row))
         
         _safe_print(table)
     except Exception as e:
@@ -367,14 +391,11 @@ def display_list(title: str, items: List[str], numbered: bool = True):
     """Display a formatted list."""
     try:
         if numbered:
-            _safe_print(f"\n[bold cyan]{title}[/bold cyan]")
-            for i, item in enumerate(items, 1):
-                _safe_print(f"  {i}. {item}")
+            lines = [f"  {i}. {item}" for i, item in enumerate(items, 1)]
         else:
-            _safe_print(f"\n[bold cyan]{title}[/bold cyan]")
-            for item in items:
-                _safe_print(f"  • {item}")
-        _safe_print("")
+            lines = [f"  • {item}" for item in items]
+        # One console.print for the whole list; rich renders each call separately
+        _safe_print(f"\n[bold cyan]{title}[/bold cyan]\n" + "\n".join(lines) + "\n")
     except Exception as e:
         logger.error(f"List display failed: {e}")
         print_error(f"Failed to display list: {e}")
@@ -437,12 +458,14 @@ def display_status_summary(status: Dict[str, Any]):
             content.append("")
         
         # Branch information
+        # Branch, remote and file names are escaped: '[' is legal in all of
+        # them and would otherwise be read as markup
         if status.get('branch'):
-            branch_line = f"{SYMBOLS['branch']} On branch [bold cyan]{status['branch']}[/bold cyan]"
+            branch_line = f"{SYMBOLS['branch']} On branch [bold cyan]{escape(status['branch'])}[/bold cyan]"
             
             # Add remote tracking info
             if status.get('remote_branch'):
-                remote = status['remote_branch']
+                remote = escape(status['remote_branch'])
                 branch_line += f" tracking [cyan]{remote}[/cyan]"
                 
                 # Add ahead/behind information
@@ -467,11 +490,7 @@ def display_status_summary(status: Dict[str, Any]):
                     content.append(f"  Your branch is up to date with '{remote}'.")
             else:
                 content.append(branch_line)
-                # Check if this branch has no upstream
-                try:
-                    from .core.git import run_git_command
-                    run_git_command(['rev-parse', '--abbrev-ref', '@{upstream}'])
-                except:
+                if not status.get('has_commits', True):
                     content.append("  No commits yet.")
             
             content.append("")
@@ -486,28 +505,26 @@ def display_status_summary(status: Dict[str, Any]):
             content.append(f"[bold red]Unmerged paths:[/bold red]")
             content.append("  (use [yellow]'git add <file>...'[/yellow] to mark resolution)")
             for file in conflicts[:10]:  # Limit display to first 10
-                content.append(f"    [red]both modified:   {file}[/red]")
+                content.append(f"    [red]both modified:   {escape(file)}[/red]")
             if len(conflicts) > 10:
                 content.append(f"    ... and {len(conflicts) - 10} more files")
             content.append("")
         
-        # Changes to be committed (staged)
-        staged_files = []
-        if status.get('staged'):
-            for item in status['staged']:
-                if isinstance(item, tuple):
-                    staged_files.append(item)
-                else:
-                    staged_files.append((item, 'modified'))
-        if status.get('renamed'):
-            staged_files.extend([(f, 'renamed') for f in status['renamed']])
-        if status.get('copied'):
-            staged_files.extend([(f, 'copied') for f in status['copied']])
+        # Changes to be committed (staged); only the displayed entries are
+        # materialised, however many files are staged
+        staged, renamed, copied = (status.get(key) or () for key in ('staged', 'renamed', 'copied'))
+        staged_count = len(staged) + len(renamed) + len(copied)
+        staged_files = chain(
+            (item if isinstance(item, tuple) else (item, 'modified') for item in staged),
+            ((f, 'renamed') for f in renamed),
+            ((f, 'copied') for f in copied),
+        )
         
-        if staged_files:
+        if staged_count:
             content.append(f"[bold green]Changes to be committed:[/bold green]")
             content.append("  (use [yellow]'bit undo'[/yellow] to unstage)")
-            for file, change_type in staged_files[:15]:  # Limit display
+            for file, change_type in islice(staged_files, 15):  # Limit display
+                file = escape(file)
                 if change_type == 'renamed':
                     content.append(f"    [green]renamed:    {file}[/green]")
                 elif change_type == 'copied':
@@ -518,8 +535,8 @@ def display_status_summary(status: Dict[str, Any]):
                     content.append(f"    [green]new file:   {file}[/green]")
                 else:
                     content.append(f"    [green]modified:   {file}[/green]")
-            if len(staged_files) > 15:
-                content.append(f"    ... and {len(staged_files) - 15} more files")
+            if staged_count > 15:
+                content.append(f"    ... and {staged_count - 15} more files")
             content.append("")
         
         # Changes not staged for commit (modified)
@@ -529,7 +546,7 @@ def display_status_summary(status: Dict[str, Any]):
             content.append("  (use [yellow]'bit save'[/yellow] to stage and commit)")
             content.append("  (use [yellow]'git checkout -- <file>...'[/yellow] to discard changes)")
             for file in modified[:15]:  # Limit display
-                content.append(f"    [red]modified:   {file}[/red]")
+                content.append(f"    [red]modified:   {escape(file)}[/red]")
             if len(modified) > 15:
                 content.append(f"    ... and {len(modified) - 15} more files")
             content.append("")
@@ -540,7 +557,7 @@ def display_status_summary(status: Dict[str, Any]):
             content.append(f"[bold red]Untracked files:[/bold red]")
             content.append("  (use [yellow]'bit save'[/yellow] to include in what will be committed)")
             for file in untracked[:15]:  # Limit display
-                content.append(f"    [red]{file}[/red]")
+                content.append(f"    [red]{escape(file)}[/red]")
             if len(untracked) > 15:
                 content.append(f"    ... and {len(untracked) - 15} more files")
             content.append("")
@@ -0,0 +1,196 @@
+"""Tests for BetterGit command helpers."""
+
+import pytest
+import subprocess
+import time
+from unittest.mock import patch
+from bettergit import cli
+
+
+# Object name placeholder in captured `git status --porcelain=v2 -z` output
+OID = b"d1d5e96190baf7b4528774f1203806f7ff8cac56"
+ENTRY_MODES = b"N... 100644 100644 100644 " + OID + b" " + OID
+
+
+class TestRepoSnapshot:
+    """Test parsing of `git status --porcelain=v2 --branch --show-stash -z` output."""
+    
+    @pytest.mark.parametrize("output, expected", [
+        pytest.param(
+            b"2 R. " + ENTRY_MODES + b" R100 new name\x00u-old name\x00"
+            b"1 .M " + ENTRY_MODES + b" mod\x00",
+            {"staged": ["new name"], "modified": ["mod"],
+             "unstaged": [("mod", cli._MODIFIED)]},
+            id="rename-consumes-original-path",
+        ),
+        pytest.param(
+            b"u UU N... 100644 100644 100644 100644 " + OID + b" " + OID + b" " + OID +
+            b" conflict file.txt\x00",
+            {"merge_conflicts": ["conflict file.txt"], "staged": [], "unstaged": []},
+            id="unmerged",
+        ),
+        pytest.param(
+            b"? dir/new file.txt\x00",
+            {"untracked": ["dir/new file.txt"],
+             "unstaged": [("dir/new file.txt", cli._UNTRACKED)]},
+            id="untracked",
+        ),
+        pytest.param(
+            b"1 .D N... 100644 100644 000000 " + OID + b" " + OID + b" gone\x00"
+            b"1 A. N... 000000 100644 100644 " + b"0" * 40 + b" " + OID + b" added\x00",
+            {"staged": ["added"], "modified": ["gone"],
+             "unstaged": [("gone", cli._DELETED)]},
+            id="deleted-and-added",
+        ),
+        pytest.param(
+            b"# branch.oid " + OID + b"\x00# branch.head feat\x00"
+            b"# branch.upstream origin/feat\x00# branch.ab +2 -1\x00# stash 3\x00",
+            {"has_commits": True, "branch": "feat", "remote_branch": "origin/feat",
+             "ahead": 2, "behind": 1, "stash_count": 3},
+            id="branch-headers",
+        ),
+        pytest.param(
+            b"# branch.oid (initial)\x00# branch.head trunk\x00",
+            {"has_commits": False, "branch": "trunk", "remote_branch": None},
+            id="unborn-branch",
+        ),
+        pytest.param(
+            b"# branch.oid " + OID + b"\x00# branch.head (detached)\x00",
+            {"branch": None},
+            id="detached-head",
+        ),
+        pytest.param(
+            b"? caf\xe9.txt\x00",
+            {"untracked": ["caf\udce9.txt"]},
+            id="non-utf8-path",
+        ),
+    ])
+    def test_parse_status(self, output, expected):
+        """Test that each kind of status entry lands in the right snapshot fields."""
+        cli._invalidate_repo_snapshot()
+        try:
+            with patch('bettergit.cli.run_git_command_bytes', return_value=(output, b"", 0)):
+                snapshot = cli._collect_repo_snapshot()
+        finally:
+            cli._invalidate_repo_snapshot()
+        
+        assert {key: snapshot[key] for key in expected} == expected
+    
+    def test_non_utf8_path_round_trips(self):
+        """Test that an undecodable file name can be handed back to git unchanged."""
+        name = cli._decode_path(b"caf\xe9.txt")
+        assert name.encode("utf-8", "surrogateescape") == b"caf\xe9.txt"
+
+
+class TestStageFiles:
+    """Test staging with as few `git add` calls as possible."""
+    
+    @pytest.fixture
+    def repo(self, tmp_path, monkeypatch):
+        subprocess.run(["git", "init", "-q", str(tmp_path)], check=True)
+        monkeypatch.chdir(tmp_path)
+        return tmp_path
+    
+    @staticmethod
+    def _staged():
+        output = subprocess.run(["git", "diff", "--cached", "--name-only"],
+                                capture_output=True, text=True, check=True).stdout
+        return output.split()
+    
+    @staticmethod
+    def _add_calls(spy):
+        return [call.args[0] for call in spy.call_args_list if call.args[0][0] == 'add']
+    
+    def test_unmatched_pathspecs_are_dropped_and_retried(self, repo):
+        """Test that k bad pathspecs cost k + 1 calls and the good files are staged."""
+        for name in ("a", "b"):
+            (repo / name).write_text(name)
+        
+        with patch('bettergit.cli.run_git_command', wraps=cli.run_git_command) as spy, \
+                patch('bettergit.cli.print_warning') as warn:
+            cli._stage_files(["a", "nope1", "b", "nope2"])
+        
+        assert self._staged() == ["a", "b"]
+        assert len(self._add_calls(spy)) == 3
+        assert all(call.kwargs["env"] == {"LC_ALL": "C"} for call in spy.call_args_list)
+        assert [call.args[0].split(":")[0] for call in warn.call_args_list] == [
+            "Could not stage nope1", "Could not stage nope2"
+        ]
+    
+    def test_other_failures_fall_back_to_one_file_at_a_time(self, repo):
+        """Test that an ignored path does not keep the other files from being staged."""
+        (repo / ".gitignore").write_text("ignored\n")
+        for name in ("a", "ignored"):
+            (repo / name).write_text(name)
+        
+        with patch('bettergit.cli.print_warning') as warn:
+            cli._stage_files(["a", "ignored"])
+        
+        assert self._staged() == ["a"]
+        assert warn.call_args.args[0].startswith("Could not stage ignored")
+    
+    def test_paths_over_the_budget_are_split(self, repo):
+        """Test that a file list longer than the argv budget is staged in several calls."""
+        names = ["aaaa", "bbbb", "cccc"]
+        for name in names:
+            (repo / name).write_text(name)
+        
+        with patch('bettergit.cli._ADD_ARGV_BUDGET', 10), \
+                patch('bettergit.cli.run_git_command', wraps=cli.run_git_command) as spy:
+            cli._stage_files(names)
+        
+        assert self._staged() == names
+        assert self._add_calls(spy) == [["add", "--", "aaaa", "bbbb"], ["add", "--", "cccc"]]
+
+
+class TestRelativeTime:
+    """Test the relative time buckets shown by list saves, history and undo."""
+    
+    NOW = 1_700_000_000
+    
+    @pytest.mark.parametrize("age, expected", [
+        (0, "just now"),
+        (59, "just now"),
+        (60, "just now"),
+        (61, "1m ago"),
+        (3600, "60m ago"),
+        (3601, "1h ago"),
+        (86399, "23h ago"),
+        (86400, "1d ago"),
+        (7 * 86400, "7d ago"),
+        (8 * 86400 - 1, "7d ago"),
+    ])
+    def test_buckets(self, age, expected):
+        """Test the boundaries between seconds, minutes, hours and days."""
+        assert cli._relative_time(self.NOW - age, self.NOW) == expected
+    
+    def test_older_than_a_week_shows_date(self):
+        """Test that anything past seven whole days is shown as a calendar date."""
+        then = self.NOW - 8 * 86400
+        assert cli._relative_time(then, self.NOW) == time.strftime('%Y-%m-%d', time.localtime(then))
+
+
+class TestMergedBranches:
+    """Test which merged branches cleanup offers to delete."""
+    
+    def test_selection(self, tmp_path, monkeypatch):
+        """Test that the current, protected and configured main branches are kept."""
+        def git(*args):
+            subprocess.run(["git", "-c", "user.name=t", "-c", "user.email=t@t", *args],
+                           check=True, capture_output=True)
+        
+        git("init", "-q", "-b", "work", str(tmp_path))
+        monkeypatch.chdir(tmp_path)
+        git("commit", "-q", "--allow-empty", "-m", "base")
+        # U+2028 is a legal branch name character that str.splitlines would split on
+        for name in ("main", "master", "develop", "trunk", "feature", "feat\u2028line"):
+            git("branch", name)
+        git("switch", "-q", "-c", "unmerged")
+        git("commit", "-q", "--allow-empty", "-m", "ahead")
+        git("switch", "-q", "work")
+        
+        settings = {"main_branch_name": "trunk"}
+        with patch('bettergit.cli.config_manager.get_default', side_effect=settings.get):
+            merged = cli._merged_branches()
+        
+        assert sorted(merged) == ["feature", "feat\u2028line"]
@@ -80,3 +80,45 @@ class TestConfigManager:
                     token = config_manager.get_credential('test_account')
                     assert token == 'test_token'
                     mock_get.assert_called_once_with('bettergit', 'test_account')
+    
+    def test_credential_lookup_cached(self):
+        """Test that repeated credential lookups hit the keyring once."""
+        with patch('pathlib.Path.home', return_value=Path(self.temp_dir)):
+            with patch('keyring.get_password', return_value=None) as mock_get:
+                with patch('keyring.set_password'):
+                    config_manager = ConfigManager()
+                    
+                    assert config_manager.get_credential('personal') is None
+                    assert config_manager.list_stored_credentials() == []
+                    mock_get.assert_called_once_with('bettergit', 'personal')
+                    
+                    # Storing a credential invalidates the cached miss
+                    config_manager.store_credential('personal', 'new_token')
+                    mock_get.return_value = 'new_token'
+                    assert config_manager.get_credential('personal') == 'new_token'
+                    assert mock_get.call_count == 2
+    
+    def test_credential_backend_failure_cached(self):
+        """Test that a failing keyring backend is only asked once per account."""
+        with patch('pathlib.Path.home', return_value=Path(self.temp_dir)):
+            with patch('keyring.get_password', side_effect=RuntimeError("no backend")) as mock_get:
+                config_manager = ConfigManager()
+                
+                assert config_manager.get_credential('personal') is None
+                assert config_manager.get_credential('personal') is None
+                assert mock_get.call_count == 1
+    
+    def test_parsed_config_reused_until_file_changes(self):
+        """Test that later loads use the JSON sidecar until config.yml changes."""
+        with patch('pathlib.Path.home', return_value=Path(self.temp_dir)):
+            assert ConfigManager().get_current_account() == 'personal'
+            assert (self.config_dir / "config.cache.json").exists()
+            
+            with patch('yaml.load') as mock_load:
+                assert ConfigManager().get_current_account() == 'personal'
+                mock_load.assert_not_called()
+            
+            config = yaml.safe_load(self.config_file.read_text())
+            config['current_account'] = 'work'
+            self.config_file.write_text(yaml.safe_dump(config))
+            assert ConfigManager().get_current_account() == 'work'
@@ -3,7 +3,9 @@
 import pytest
 import subprocess
 from unittest.mock import patch, MagicMock
-from bettergit.core.git import run_git_command, GitError, check_git_available
+from bettergit.core.git import (
+    run_git_command, GitError, GitSession, RepoLock, check_git_available, get_repo_info, _lock_file
+)
 
 
 class TestGitWrapper:
@@ -70,3 +72,58 @@ class TestGitWrapper:
                 run_git_command(['status'])
             
             assert "Git is not installed" in str(exc_info.value)
+    
+    def test_git_session_caches_queries(self):
+        """Test that repeated session queries run git once until invalidated."""
+        session = GitSession()
+        
+        with patch('bettergit.core.git.run_git_command', return_value=("url", "", 0)) as mock_run:
+            assert session.query(['remote', 'get-url', 'origin']) == "url"
+            assert session.query(['remote', 'get-url', 'origin']) == "url"
+            assert mock_run.call_count == 1
+            
+            session.invalidate()
+            session.query(['remote', 'get-url', 'origin'])
+            assert mock_run.call_count == 2
+    
+    def test_repo_lock_reentrant_and_exclusive(self, tmp_path):
+        """Test that the repository lock nests in-process and times out when held elsewhere."""
+        with RepoLock(str(tmp_path)) as outer:
+            with RepoLock(str(tmp_path)):
+                assert outer.path in RepoLock._held
+        assert outer.path not in RepoLock._held
+        
+        with open(tmp_path / "bettergit.lock", "a+") as other:
+            _lock_file(other)
+            with pytest.raises(GitError):
+                with RepoLock(str(tmp_path), timeout=0):
+                    pass
+    
+    def test_object_infos_resolves_in_order(self, tmp_path, monkeypatch):
+        """Test batched cat-file lookups across chunks, with missing and invalid revisions."""
+        subprocess.run(["git", "init", "-q", str(tmp_path)], check=True)
+        subprocess.run(["git", "-C", str(tmp_path), "-c", "user.name=t", "-c", "user.email=t@t",
+                        "commit", "-q", "--allow-empty", "-m", "init"], check=True)
+        monkeypatch.chdir(tmp_path)
+        session = GitSession()
+        session.QUERY_CHUNK = 2
+        try:
+            head, missing, invalid, tree = session.object_infos(["HEAD", "nope", "a\nb", "HEAD^{tree}"])
+            assert head[1] == "commit" and tree[1] == "tree"
+            assert missing is None and invalid is None
+            assert session.object_info("HEAD") == head
+            assert session.object_infos(["refs/heads/foo bar", "a b c"]) == [None, None]
+        finally:
+            session.close()
+    
+    def test_repo_info_outside_repository_skips_git(self, tmp_path, monkeypatch):
+        """Test that a directory with no repository above it is answered without running git."""
+        monkeypatch.delenv("GIT_DIR", raising=False)
+        with patch('bettergit.core.git.run_git_command') as mock_run:
+            assert get_repo_info(str(tmp_path)).in_repo is False
+            mock_run.assert_not_called()
+        
+        subprocess.run(["git", "init", "-q", str(tmp_path)], check=True)
+        (tmp_path / "sub").mkdir()
+        assert get_repo_info(str(tmp_path / "sub")).in_repo is True
+        assert get_repo_info(str(tmp_path / ".git")).in_repo is True
@@ -0,0 +1,109 @@
+"""Tests for BetterGit action history."""
+
+import json
+import os
+import subprocess
+import sys
+import pytest
+from pathlib import Path
+from unittest.mock import patch
+from bettergit.history import ActionHistory
+
+
+class TestActionHistory:
+    """Test the append-only action history."""
+    
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        """Set up test environment."""
+        self.temp_dir = str(tmp_path)
+        self.config_dir = tmp_path / ".config" / "bettergit"
+    
+    def _make_history(self):
+        with patch('pathlib.Path.home', return_value=Path(self.temp_dir)):
+            history = ActionHistory()
+        # Small blocks so tail reads cross block boundaries
+        history._TAIL_CHUNK = 16
+        return history
+    
+    def test_log_and_read_recent(self):
+        """Test that actions are appended and read back newest last."""
+        history = self._make_history()
+        for i in range(5):
+            history.log_action("save", {"message": f"change {i}"})
+        
+        recent = history.get_history(2)
+        assert [a["id"] for a in recent] == [4, 5]
+        assert recent[-1]["details"]["message"] == "change 4"
+        assert len(history.get_history()) == 5
+        assert history.get_last_action()["id"] == 5
+    
+    def test_remove_action_truncates(self):
+        """Test removing an action drops it and everything after it."""
+        history = self._make_history()
+        for i in range(4):
+            history.log_action("push", {"branch": "main"})
+        
+        assert history.remove_action(3)["id"] == 3
+        assert [a["id"] for a in history.get_history()] == [1, 2]
+        assert history.remove_last_action()["id"] == 2
+        
+        history.log_action("pull", {"branch": "main"})
+        assert [a["id"] for a in history.get_history()] == [1, 2]
+    
+    def test_remove_actions_keeps_others(self):
+        """Test removing several actions keeps the ones between and after them."""
+        history = self._make_history()
+        for i in range(6):
+            history.log_action("save", {"message": f"change {i}"})
+        
+        removed = history.remove_actions([5, 3, 42])
+        assert [a["id"] for a in removed] == [5, 3]
+        assert [a["id"] for a in history.get_history()] == [1, 2, 4, 6]
+        assert history.remove_actions([42]) == []
+        
+        history.log_action("push", {"branch": "main"})
+        assert history.get_last_action()["id"] == 7
+    
+    def test_history_read_is_capped(self):
+        """Test that reads return at most MAX_ACTIONS, however long the file is."""
+        history = self._make_history()
+        history.MAX_ACTIONS = 3
+        for i in range(5):
+            history.log_action("save", {"message": f"change {i}"})
+        
+        assert [a["id"] for a in history.get_history()] == [3, 4, 5]
+        assert len(history.get_history(10)) == 3
+    
+    def test_concurrent_processes_get_unique_ids(self):
+        """Test that bit processes logging at the same time never reuse an id."""
+        script = ("from bettergit.history import history_manager as h\n"
+                  "for i in range(20): h.log_action('save', {})\n")
+        env = dict(os.environ, HOME=self.temp_dir, USERPROFILE=self.temp_dir)
+        processes = [subprocess.Popen([sys.executable, "-c", script], env=env) for _ in range(3)]
+        assert all(process.wait() == 0 for process in processes)
+        
+        lines = (self.config_dir / "history.jsonl").read_text().splitlines()
+        assert sorted(json.loads(line)["id"] for line in lines) == list(range(1, 61))
+    
+    def test_migrates_legacy_json(self):
+        """Test that an old history.json array is converted on first use."""
+        self.config_dir.mkdir(parents=True)
+        legacy = [{"id": 1, "timestamp": "2024-01-01T00:00:00", "action_type": "save",
+                   "details": {}, "undo_command": None, "undo_details": {}}]
+        (self.config_dir / "history.json").write_text(json.dumps(legacy))
+        
+        history = self._make_history()
+        
+        assert not (self.config_dir / "history.json").exists()
+        assert history.get_history() == legacy
+    
+    def test_flush_writes_queued_actions(self):
+        """Test that queued actions reach the file in order once flushed."""
+        history = self._make_history()
+        for i in range(3):
+            history.log_action("save", {"message": f"change {i}"})
+        
+        history.flush()
+        lines = (self.config_dir / "history.jsonl").read_text().splitlines()
+        assert [json.loads(line)["id"] for line in lines] == [1, 2, 3]
@@ -0,0 +1,146 @@
+"""Tests for BetterGit third-party integrations."""
+
+import os
+import time
+from unittest.mock import patch, MagicMock
+import pytest
+from bettergit.integrations import GitHubClient, RateLimitError
+from bettergit.integrations.base import HTTPCache
+
+
+def _response(status_code, body=None, etag=None, headers=None):
+    """Build a fake requests.Response."""
+    response = MagicMock()
+    response.status_code = status_code
+    response.ok = status_code < 400
+    response.content = b"{}" if body is not None else b""
+    response.json.return_value = body
+    response.headers = dict(headers or {})
+    if etag:
+        response.headers["ETag"] = etag
+    return response
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """A temporary HTTP cache in place of the shared one in ~/.config."""
+    cache = HTTPCache(tmp_path / "http_cache.json")
+    with patch('bettergit.integrations.base.http_cache', cache):
+        yield cache
+
+
+@pytest.fixture
+def client(cache):
+    """A GitHub client whose responses only ever reach the temporary cache."""
+    return GitHubClient("token")
+
+
+class TestConditionalRequests:
+    """Test ETag revalidation of GET requests."""
+    
+    def test_not_modified_uses_cached_body(self, cache, client):
+        """Test that a 304 answer returns the body stored with the ETag."""
+        with patch.object(client.session, 'request') as mock_request:
+            mock_request.return_value = _response(200, {"title": "Bug"}, '"abc"')
+            assert client.get_issue("owner", "repo", 1) == {"title": "Bug"}
+            
+            # Once past its max age the entry is revalidated with its ETag
+            cache.expire()
+            mock_request.return_value = _response(304)
+            assert client.get_issue("owner", "repo", 1) == {"title": "Bug"}
+            
+            headers = mock_request.call_args.kwargs["headers"]
+            assert headers == {"If-None-Match": '"abc"'}
+        
+        # The entry survives a reload from disk
+        cache.save()
+        assert HTTPCache(cache.cache_file).entries == cache.entries
+
+
+class TestHTTPCache:
+    """Test what the on-disk cache keeps and how it is written."""
+    
+    def test_only_read_fields_are_stored_privately(self, cache, client):
+        """Test that cached bodies keep just the caller's fields in a 0600 file."""
+        body = {"number": 1, "title": "Bug", "body": "secret", "head": {"ref": "fix", "sha": "abc"},
+                "user": None}
+        
+        with patch.object(client.session, 'request', return_value=_response(200, body, '"e"')):
+            pr = client.get_pull_request("owner", "repo", 1)
+        
+        assert pr == {"number": 1, "title": "Bug", "user": None, "head": {"ref": "fix"}}
+        assert [entry["body"] for entry in cache.entries.values()] == [pr]
+        
+        # Written once, when saved at the end of the command
+        assert not cache.cache_file.exists()
+        cache.save()
+        if os.name == 'posix':
+            assert cache.cache_file.stat().st_mode & 0o777 == 0o600
+        assert HTTPCache(cache.cache_file).entries == cache.entries
+
+
+class TestFreshResponses:
+    """Test reuse of recently cached responses without a request."""
+    
+    def test_fresh_response_skips_request_until_write(self, cache, client):
+        """Test that a recent GraphQL result is reused and a write makes it stale."""
+        data = {"data": {"repository": {"issue": {"title": "Bug", "labels": {"nodes": []}}}}}
+        
+        with patch.object(client.session, 'request', return_value=_response(200, data)) as mock_request:
+            assert client.get_issue_summary("owner", "repo", 1)["title"] == "Bug"
+            assert client.get_issue_summary("owner", "repo", 1)["title"] == "Bug"
+            assert mock_request.call_count == 1
+            
+            # A different query is not served from the cache
+            client.get_issue_summary("owner", "repo", 2)
+            assert mock_request.call_count == 2
+            
+            mock_request.return_value = _response(201, {"number": 3})
+            client.create_pull_request("owner", "repo", "t", "b", "feat")
+            mock_request.return_value = _response(200, data)
+            client.get_issue_summary("owner", "repo", 1)
+            assert mock_request.call_count == 4
+
+
+class TestRateLimits:
+    """Test handling of exhausted rate limits."""
+    
+    def test_short_wait_is_retried(self, client):
+        """Test that a Retry-After within the limit sleeps and retries once."""
+        limited = _response(429, headers={"Retry-After": "2"})
+        
+        with patch('bettergit.integrations.base.time.sleep') as mock_sleep:
+            with patch.object(client.session, 'request', side_effect=[limited, _response(201, {"number": 7})]):
+                assert client.create_pull_request("owner", "repo", "t", "b", "feat") == {"number": 7}
+            mock_sleep.assert_called_once_with(2.0)
+    
+    def test_long_wait_raises(self, client):
+        """Test that an exhausted hourly quota raises RateLimitError with the reset time."""
+        reset = int(time.time()) + 3600
+        limited = _response(403, headers={"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(reset)})
+        
+        with patch.object(client.session, 'request', return_value=limited):
+            with pytest.raises(RateLimitError) as exc_info:
+                client.create_pull_request("owner", "repo", "t", "b", "feat")
+        
+        assert exc_info.value.reset_at >= reset
+
+
+class TestPagination:
+    """Test concurrent fetching of paginated lists."""
+    
+    def test_pages_fetched_until_limit_or_short_page(self, client):
+        """Test that pages are combined in order and fetching stops at a short page."""
+        
+        def fake_request(method, url, json, params, headers, timeout):
+            page = params["page"]
+            count = params["per_page"] if page < 3 else 5
+            return _response(200, [{"number": (page - 1) * 100 + i} for i in range(count)])
+        
+        with patch.object(client.session, 'request', side_effect=fake_request) as mock_request:
+            prs = client.list_pull_requests("owner", "repo", limit=250)
+            assert [pr["number"] for pr in prs] == list(range(205))
+            assert mock_request.call_count == 3
+            
+            assert len(client.list_pull_requests("owner", "repo", limit=10)) == 10
+            assert mock_request.call_args.kwargs["params"]["per_page"] == 10